@@ -0,0 +1,39 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+# _hamming.pyx
+# Copyright (c) 2025 tiMaxal
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Optional compiled kernel for pair3d's hash comparisons.
+
+pair3d falls back to a NumPy implementation when this extension is not built.
+"""
+
+import numpy as np
+from libc.stdint cimport uint8_t, uint64_t
+
+cdef extern from *:
+    """
+    #if defined(_MSC_VER)
+    #include <intrin.h>
+    static __inline int popcount64(unsigned long long x) { return (int)__popcnt64(x); }
+    #else
+    static inline int popcount64(unsigned long long x) { return __builtin_popcountll(x); }
+    #endif
+    """
+    int popcount64(unsigned long long x) nogil
+
+
+def hamming_distances(uint64_t anchor, const uint64_t[::1] values):
+    """
+    Return the bit distance between a uint64 anchor hash and a contiguous array of uint64 hashes.
+    """
+    cdef Py_ssize_t i, n = values.shape[0]
+    out = np.empty(n, dtype=np.uint8)
+    cdef uint8_t[::1] dist = out
+    with nogil:
+        for i in range(n):
+            dist[i] = popcount64(anchor ^ values[i])
+    return out
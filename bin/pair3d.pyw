@@ -0,0 +1,3 @@
+#!/usr/bin/env pythonw
+from pair3d import main
+raise SystemExit(main())
@@ -12,6 +12,8 @@ Pairs are detected based on timestamps and perceptual similarity, organized into
 and optionally moved to a '_x2_[folder]' structure. Built with Flask and Flask-SocketIO.
 """
 
+import hashlib
+import io
 import os
 import shutil
 import zipfile
@@ -23,8 +25,9 @@ from flask_socketio import SocketIO, emit
 from PIL import Image
 import imagehash
 import json
+import sqlite3
 import tempfile
-from werkzeug.utils import secure_filename
+from concurrent.futures import ThreadPoolExecutor
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = tempfile.gettempdir()
@@ -32,6 +35,8 @@ socketio = SocketIO(app)
 
 TIME_DIFF_THRESHOLD = 2
 HASH_DIFF_THRESHOLD = 10
+IMAGE_EXTENSIONS = frozenset({"jpg", "jpeg", "png"})
+MOVE_WORKERS = 8
 processing = False
 
 def get_app_dir():
@@ -41,6 +46,7 @@ def get_app_dir():
     return config_dir
 
 SETTINGS_FILE = os.path.join(get_app_dir(), "pair3d_settings.json")
+HASH_CACHE_FILE = os.path.join(get_app_dir(), "phash.db")
 
 def load_last_folder():
     """Load last used folder from settings."""
@@ -59,6 +65,11 @@ def save_last_folder(folder):
     except Exception as e:
         print(f"Failed to save settings: {e}")
 
+def is_image_file(name):
+    """Check if a filename has a supported image extension."""
+    _, dot, ext = name.rpartition(".")
+    return bool(dot) and ext.lower() in IMAGE_EXTENSIONS
+
 def get_image_files(directory, recursive=False, include_singles=False):
     """Retrieve image file paths from directory."""
     image_files = []
@@ -71,15 +82,15 @@ def get_image_files(directory, recursive=False, include_singles=False):
                 skip_folders.append("_singles")
             dirs[:] = [d for d in dirs if d not in skip_folders]
             for f in files:
-                if f.lower().endswith((".jpg", ".jpeg", ".png")):
+                if is_image_file(f):
                     image_files.append(os.path.join(root, f))
     else:
-        image_files = [
-            os.path.join(directory, f)
-            for f in os.listdir(directory)
-            if f.lower().endswith((".jpg", ".jpeg", ".png"))
-            and os.path.isfile(os.path.join(directory, f))
-        ]
+        with os.scandir(directory) as entries:
+            image_files = [
+                entry.path
+                for entry in entries
+                if is_image_file(entry.name) and entry.is_file()
+            ]
     return image_files
 
 def get_image_files_by_folder(directory, recursive=False, include_singles=False):
@@ -96,7 +107,7 @@ def get_image_files_by_folder(directory, recursive=False, include_singles=False)
             image_files = [
                 os.path.join(root, f)
                 for f in files
-                if f.lower().endswith((".jpg", ".jpeg", ".png"))
+                if is_image_file(f)
             ]
             if image_files:
                 folders[root] = image_files
@@ -111,15 +122,127 @@ def get_image_timestamp(path):
     except Exception:
         return None
 
-def is_similar_image(file1, file2):
-    """Check if two images are perceptually similar."""
+def compute_phash(path):
+    """Compute the perceptual hash of an image, or None if it cannot be read."""
     try:
-        with Image.open(file1) as img1, Image.open(file2) as img2:
-            hash1 = imagehash.phash(img1)
-            hash2 = imagehash.phash(img2)
-        return abs(hash1 - hash2) < HASH_DIFF_THRESHOLD
+        with Image.open(path, formats=["JPEG", "PNG"]) as img:
+            # phash only needs a small greyscale image, so let libjpeg decode at reduced scale
+            img.draft("L", (64, 64))
+            return imagehash.phash(img)
     except Exception:
+        return None
+
+def file_digest(path):
+    """Return the sha1 of a file's bytes, or None if it cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+def get_phashes(paths, log=print):
+    """Return {path: phash}, reusing hashes cached on disk.
+
+    Rows are matched on (path, size, mtime_ns) first. Uploads are extracted into a new temp
+    directory each time, so on a miss the file's sha1 is looked up before decoding the image.
+    """
+    hashes = {}
+    new_rows = []
+    try:
+        conn = sqlite3.connect(HASH_CACHE_FILE)
+    except sqlite3.Error as e:
+        log(f"Hash cache unavailable: {e}")
+        return {path: compute_phash(path) for path in paths}
+    try:
+        # One row per distinct image, recording where it was last seen
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS phash "
+            "(digest TEXT PRIMARY KEY, path TEXT, size INTEGER, mtime_ns INTEGER, h TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS phash_path ON phash (path)")
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                hashes[path] = None
+                continue
+            row = conn.execute(
+                "SELECT h FROM phash WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, st.st_size, st.st_mtime_ns)
+            ).fetchone()
+            if row:
+                hashes[path] = imagehash.hex_to_hash(row[0])
+                continue
+            digest = file_digest(path)
+            if digest is None:
+                hashes[path] = None
+                continue
+            row = conn.execute("SELECT h FROM phash WHERE digest = ?", (digest,)).fetchone()
+            h = imagehash.hex_to_hash(row[0]) if row else compute_phash(path)
+            hashes[path] = h
+            if h is not None:
+                new_rows.append((digest, path, st.st_size, st.st_mtime_ns, str(h)))
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO phash VALUES (?, ?, ?, ?, ?)", new_rows)
+    except sqlite3.Error as e:
+        log(f"Hash cache error: {e}")
+        for path in paths:
+            if path not in hashes:
+                hashes[path] = compute_phash(path)
+    finally:
+        conn.close()
+    return hashes
+
+def is_similar_hash(hash1, hash2):
+    """Check if two perceptual hashes are within the similarity threshold."""
+    if hash1 is None or hash2 is None:
         return False
+    return abs(hash1 - hash2) < HASH_DIFF_THRESHOLD
+
+def is_similar_image(file1, file2):
+    """Check if two images are perceptually similar."""
+    return is_similar_hash(compute_phash(file1), compute_phash(file2))
+
+def hamming_distance(a, b):
+    """Count differing bits between two integer hashes."""
+    return bin(a ^ b).count("1")
+
+class BKTree:
+    """BK-tree over integer hashes for Hamming-radius lookups."""
+
+    def __init__(self):
+        self._root = None
+
+    def add(self, value, item):
+        """Insert an integer hash with an associated item."""
+        node = (value, item, {})
+        if self._root is None:
+            self._root = node
+            return
+        current = self._root
+        while True:
+            distance = hamming_distance(value, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def find(self, value, radius):
+        """Return items whose hash is within 'radius' bits of 'value'."""
+        results = []
+        if self._root is None:
+            return results
+        stack = [self._root]
+        while stack:
+            node_value, item, children = stack.pop()
+            distance = hamming_distance(value, node_value)
+            if distance <= radius:
+                results.append(item)
+            for child_distance, child in children.items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        return results
 
 def delete_if_empty(path):
     """Delete folder if empty or contains only .picasa.ini."""
@@ -131,17 +254,37 @@ def delete_if_empty(path):
             os.remove(os.path.join(path, '.picasa.ini'))
             os.rmdir(path)
 
+def move_file(src, dst):
+    """Move a single file, ignoring files that have already disappeared."""
+    try:
+        # Destinations normally live on the same filesystem, so a single
+        # rename suffices; fall back to a copy+delete across devices.
+        os.replace(src, dst)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        try:
+            shutil.move(src, dst)
+        except FileNotFoundError:
+            pass
+
+def move_files(moves):
+    """Move a list of (src, dst) files concurrently to overlap I/O latency."""
+    if not moves:
+        return
+    with ThreadPoolExecutor(max_workers=MOVE_WORKERS) as executor:
+        list(executor.map(lambda move: move_file(*move), moves))
+
 def move_contents(src_dir, dst_dir):
     """Move files from src_dir to dst_dir and delete src_dir if empty."""
     os.makedirs(dst_dir, exist_ok=True)
+    moves = []
     for item in os.listdir(src_dir):
         src_item = os.path.join(src_dir, item)
         dst_item = os.path.join(dst_dir, item)
         if os.path.isfile(src_item):
-            try:
-                shutil.move(src_item, dst_item)
-            except FileNotFoundError:
-                pass
+            moves.append((src_item, dst_item))
+    move_files(moves)
     delete_if_empty(src_dir)
 
 @app.route('/')
@@ -175,14 +318,15 @@ def upload_folder():
         return {"error": "No file selected"}, 400
 
     temp_dir = tempfile.mkdtemp()
-    zip_path = os.path.join(temp_dir, secure_filename(file.filename))
-    file.save(zip_path)
-
     src_root = os.path.join(temp_dir, "extracted")
     os.makedirs(src_root, exist_ok=True)
 
     try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        # Extract straight from the upload stream rather than saving the ZIP first
+        stream = file.stream
+        if not getattr(stream, "seekable", lambda: False)():
+            stream = io.BytesIO(file.read())
+        with zipfile.ZipFile(stream, 'r') as zip_ref:
             zip_ref.extractall(src_root)
     except Exception as e:
         shutil.rmtree(temp_dir, ignore_errors=True)
@@ -234,49 +378,61 @@ def process_images(src_root, temp_dir, process_subfolders, include_singles, move
             'total': total_files
         })
 
+    created_dirs = set()
+    def ensure_dir(path):
+        if path not in created_dirs:
+            os.makedirs(path, exist_ok=True)
+            created_dirs.add(path)
+
     # Sorting Phase
     image_files.sort(key=lambda x: get_image_timestamp(x) or datetime.min)
+    hashes = get_phashes(image_files, log)
+    hash_ints = [int(str(hashes[p]), 16) if hashes[p] is not None else None for p in image_files]
+    tree = BKTree()
+    for idx, h in enumerate(hash_ints):
+        if h is not None:
+            tree.add(h, idx)
     used = set()
     pairs = []
     for i, path1 in enumerate(image_files):
         if path1 in used:
             continue
         time1 = get_image_timestamp(path1)
-        if time1 is None:
+        if time1 is None or hash_ints[i] is None:
             continue
-        for path2 in image_files[i+1:]:
+        # Only visually similar images are candidates; keep the earliest one in time order
+        candidates = sorted(j for j in tree.find(hash_ints[i], HASH_DIFF_THRESHOLD - 1) if j > i)
+        for j in candidates:
+            path2 = image_files[j]
             if path2 in used:
                 continue
             time2 = get_image_timestamp(path2)
             if time2 and abs((time2 - time1).total_seconds()) <= TIME_DIFF_THRESHOLD:
-                if is_similar_image(path1, path2):
-                    pairs.append((path1, path2))
-                    used.add(path1)
-                    used.add(path2)
-                    break
+                pairs.append((path1, path2))
+                used.add(path1)
+                used.add(path2)
+                break
         progress_callback(min(100, int((i / len(image_files)) * 100)))
 
+    moves = []
     for pair in pairs:
         for file in pair:
             subdir = os.path.dirname(file)
             dest_dir = os.path.join(subdir, "_pairs")
-            os.makedirs(dest_dir, exist_ok=True)
-            try:
-                shutil.move(file, os.path.join(dest_dir, os.path.basename(file)))
-            except FileNotFoundError:
-                pass
+            ensure_dir(dest_dir)
+            moves.append((file, os.path.join(dest_dir, os.path.basename(file))))
+    move_files(moves)
 
+    moves = []
     for file in image_files:
         if file not in used:
             subdir = os.path.dirname(file)
             if os.path.basename(subdir) == "_singles":
                 continue
             dest_dir = os.path.join(subdir, "_singles")
-            os.makedirs(dest_dir, exist_ok=True)
-            try:
-                shutil.move(file, os.path.join(dest_dir, os.path.basename(file)))
-            except FileNotFoundError:
-                pass
+            ensure_dir(dest_dir)
+            moves.append((file, os.path.join(dest_dir, os.path.basename(file))))
+    move_files(moves)
 
     num_pairs = len(pairs)
     num_singles = len(image_files) - len(used)
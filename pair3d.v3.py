@@ -39,15 +39,72 @@ import os
 import shutil
 import threading
 import time
-from tkinter import filedialog, messagebox, Tk, Label, Button, Listbox, END, StringVar
-from tkinter import ttk
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from PIL import Image
-import imagehash
 import json
+import importlib
+from bisect import bisect_right
+
+# Pillow, imagehash and numpy are imported inside the functions that use them,
+# so importing this module (and each hashing worker process) starts quickly.
+
+__version__ = "1.3.0"
+
+__all__ = [
+    "main",
+    "cli_main",
+    "get_image_files",
+    "get_image_files_by_folder",
+    "get_image_mtime",
+    "compute_phash",
+    "is_similar_hash",
+    "is_similar_image",
+    "move_contents",
+    "delete_if_empty",
+]
+
+class _LazyModule:
+    """
+    Stand-in for a module that is imported the first time one of its attributes is used.
+    """
+    def __init__(self, name, hint=None):
+        self._name = name
+        self._hint = hint
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            try:
+                self._module = importlib.import_module(self._name)
+            except ImportError as e:
+                message = f"{self._name} is required for this feature"
+                if self._hint:
+                    message += f" ({self._hint})"
+                raise ImportError(message) from e
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+def lazy_import(name, hint=None):
+    """
+    Return a proxy for module 'name' that defers the import until first attribute access.
+    """
+    return _LazyModule(name, hint)
+
+# The GUI toolkit is only loaded once the window is built
+_TK_HINT = "install Tk support, e.g. 'sudo apt-get install python3-tk'"
+tk = lazy_import("tkinter", _TK_HINT)
+ttk = lazy_import("tkinter.ttk", _TK_HINT)
+filedialog = lazy_import("tkinter.filedialog", _TK_HINT)
+messagebox = lazy_import("tkinter.messagebox", _TK_HINT)
 
 TIME_DIFF_THRESHOLD = 2
 HASH_DIFF_THRESHOLD = 10
+MOVE_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_IMG_EXTS = frozenset({".jpg", ".jpeg", ".png"})
 
 def get_app_dir():
     """
@@ -66,6 +123,23 @@ def get_app_dir():
 
 SETTINGS_FILE = os.path.join(get_app_dir(), "pair3d_settings.json")
 
+_LIBPHASH = None  # libphash ImageContext, False if not installed, None until checked
+_HAMMING_EXT = None  # compiled _hamming.hamming_distances, False if not built, None until checked
+
+def _libphash_context():
+    """
+    Return libphash's ImageContext if the C backend is installed, otherwise None.
+    The import is attempted once, on first use.
+    """
+    global _LIBPHASH
+    if _LIBPHASH is None:
+        try:
+            from libphash import ImageContext
+            _LIBPHASH = ImageContext
+        except ImportError:
+            _LIBPHASH = False
+    return _LIBPHASH or None
+
 def load_last_folder():
     """
     Load the last used folder path from the settings file.
@@ -89,6 +163,38 @@ def save_last_folder(folder):
     except Exception as e:
         print(f"Failed to save settings: {e}")
 
+def _is_image(name):
+    """
+    Check a filename's extension against _IMG_EXTS, lowercasing only the suffix.
+    """
+    i = name.rfind(".")
+    return i >= 0 and name[i:].lower() in _IMG_EXTS
+
+def _scan_images(directory, recursive=False, include_singles=False):
+    """
+    Yield (folder, image DirEntries) for the directory, reading each folder with a single scandir.
+    """
+    skip_folders = {"_pairs"} if include_singles else {"_pairs", "_singles"}
+    pending = [directory]
+    while pending:
+        folder = pending.pop()
+        images = []
+        subdirs = []
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and entry.name not in skip_folders:
+                            subdirs.append(entry.path)
+                    elif _is_image(entry.name) and entry.is_file():
+                        images.append(entry)
+        except OSError:
+            if folder == directory:
+                raise
+            continue
+        yield folder, images
+        pending.extend(reversed(subdirs))
+
 def get_image_files(directory, recursive=False, include_singles=False):
     """
     Retrieve a list of image file paths from the given directory.
@@ -96,94 +202,184 @@ def get_image_files(directory, recursive=False, include_singles=False):
     image_files = []
     if not os.path.exists(directory):
         return image_files
-    if recursive:
-        for root, dirs, files in os.walk(directory):
-            skip_folders = ["_pairs"]
-            if not include_singles:
-                skip_folders.append("_singles")
-            dirs[:] = [d for d in dirs if d not in skip_folders]
-            for f in files:
-                if f.lower().endswith((".jpg", ".jpeg", ".png")):
-                    image_files.append(os.path.join(root, f))
-    else:
-        image_files = [
-            os.path.join(directory, f)
-            for f in os.listdir(directory)
-            if f.lower().endswith((".jpg", ".jpeg", ".png"))
-            and os.path.isfile(os.path.join(directory, f))
-        ]
+    for _, entries in _scan_images(directory, recursive, include_singles):
+        image_files.extend(entry.path for entry in entries)
     return image_files
 
-def get_image_files_by_folder(directory, recursive=False, include_singles=False):
+def get_image_files_by_folder(directory, recursive=False, include_singles=False, mtimes=None):
     """
     Retrieve image files grouped by folder.
+    If 'mtimes' is a dict, it is filled with {path: st_mtime} from the same directory scan.
     """
     folders = {}
     if not os.path.exists(directory):
         return folders
-    if recursive:
-        for root, dirs, files in os.walk(directory):
-            skip_folders = ["_pairs"]
-            if not include_singles:
-                skip_folders.append("_singles")
-            dirs[:] = [d for d in dirs if d not in skip_folders]
-            image_files = [
-                os.path.join(root, f)
-                for f in files
-                if f.lower().endswith((".jpg", ".jpeg", ".png"))
-            ]
-            if image_files:
-                folders[root] = image_files
-    else:
-        folders[directory] = get_image_files(directory, recursive=False, include_singles=include_singles)
+    for folder, entries in _scan_images(directory, recursive, include_singles):
+        if entries or not recursive:
+            folders[folder] = [entry.path for entry in entries]
+        if mtimes is not None:
+            for entry in entries:
+                try:
+                    mtimes[entry.path] = entry.stat().st_mtime
+                except OSError:
+                    pass
     return folders
 
-def get_image_timestamp(path):
+def get_image_mtime(path):
     """
-    Get the modification timestamp of an image file.
+    Get the modification time of an image file in seconds since the epoch.
     """
     try:
-        return datetime.fromtimestamp(os.path.getmtime(path))
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def _phash_hex(path, img):
+    """
+    Return the phash of an opened image as a 16-digit hex string.
+    Uses the C libphash backend when it is installed, otherwise imagehash.
+    JPEGs are put into draft mode first, so 'img' should not be reused at full size afterwards.
+    """
+    import imagehash
+    image_context = _libphash_context()
+    if image_context is not None:
+        with image_context(path) as ctx:
+            return f"{int(ctx.phash):016x}"
+    if img.format == "JPEG":
+        # phash only needs 32x32 grayscale: let libjpeg decode at reduced scale
+        img.draft("L", (64, 64))
+    return str(imagehash.phash(img))
+
+def compute_phash(path):
+    """
+    Compute the perceptual hash of an image, or None if it cannot be read.
+    """
+    from PIL import Image
+    import imagehash
+    try:
+        with Image.open(path) as img:
+            return imagehash.hex_to_hash(_phash_hex(path, img))
     except Exception:
         return None
 
-def is_similar_image(file1, file2):
+def _phash_worker(path):
     """
-    Determine if two images are perceptually similar using phash.
+    Process-pool worker: return (path, hex phash, hex dhash, (width, height)) so results pickle cheaply.
+    The dhash is a cheap gradient hash used to pre-filter candidates before the phash comparison.
     """
+    from PIL import Image
+    import imagehash
     try:
-        with Image.open(file1) as img1, Image.open(file2) as img2:
-            hash1 = imagehash.phash(img1)
-            hash2 = imagehash.phash(img2)
-        return abs(hash1 - hash2) < HASH_DIFF_THRESHOLD
+        with Image.open(path) as img:
+            size = img.size
+            phash = _phash_hex(path, img)
+            if img.format == "JPEG":
+                img.draft("L", (64, 64))
+            return path, phash, str(imagehash.dhash(img)), size
     except Exception:
+        return path, None, None, None
+
+def is_same_aspect(size1, size2, tolerance=0.01):
+    """
+    Check whether two (width, height) sizes share an aspect ratio within 'tolerance'.
+    """
+    if not size1 or not size2 or not size1[1] or not size2[1]:
+        return False
+    ratio1 = size1[0] / size1[1]
+    ratio2 = size2[0] / size2[1]
+    return abs(ratio1 - ratio2) <= tolerance * ratio1
+
+def _hamming_ext():
+    """
+    Return the compiled hamming_distances from the optional _hamming extension, otherwise None.
+    """
+    global _HAMMING_EXT
+    if _HAMMING_EXT is None:
+        try:
+            from _hamming import hamming_distances as fast_hamming
+            _HAMMING_EXT = fast_hamming
+        except ImportError:
+            _HAMMING_EXT = False
+    return _HAMMING_EXT or None
+
+def hamming_distances(anchor, hash_values):
+    """
+    Return the bit distance between a uint64 anchor hash and an array of uint64 hashes.
+    Uses the compiled _hamming extension when it is built, otherwise NumPy.
+    """
+    import numpy as np
+    fast_hamming = _hamming_ext()
+    if fast_hamming is not None:
+        return fast_hamming(anchor, np.ascontiguousarray(hash_values, dtype=np.uint64))
+    xor = np.bitwise_xor(hash_values, anchor)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(xor)
+    return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+def is_similar_hash(hash1, hash2):
+    """
+    Determine if two precomputed phashes are within HASH_DIFF_THRESHOLD bits.
+    """
+    if hash1 is None or hash2 is None:
         return False
+    return abs(hash1 - hash2) < HASH_DIFF_THRESHOLD
+
+def is_similar_image(file1, file2):
+    """
+    Determine if two images are perceptually similar using phash.
+    Callers comparing one image against many should hash it once with compute_phash and use is_similar_hash.
+    """
+    return is_similar_hash(compute_phash(file1), compute_phash(file2))
 
 def delete_if_empty(path):
     """
     Delete the folder at 'path' if it is empty, including any .picasa.ini-only folders.
     """
-    if os.path.isdir(path):
-        contents = os.listdir(path)
-        if not contents:
-            os.rmdir(path)
-        elif contents == ['.picasa.ini']:
-            os.remove(os.path.join(path, '.picasa.ini'))
-            os.rmdir(path)
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    if not entries:
+        os.rmdir(path)
+    elif len(entries) == 1 and entries[0].name == '.picasa.ini':
+        os.remove(entries[0].path)
+        os.rmdir(path)
+
+def move_file(src, dst):
+    """
+    Move a file with a single rename where possible, ignoring files that have vanished.
+    """
+    try:
+        os.rename(src, dst)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        # Cross-device or existing destination: let shutil handle copy/replace
+        try:
+            shutil.move(src, dst)
+        except FileNotFoundError:
+            pass
+
+def move_files(moves):
+    """
+    Move a list of (src, dst) files on a thread pool; moves are I/O-bound, so threads overlap them.
+    """
+    if len(moves) < 2:
+        for src, dst in moves:
+            move_file(src, dst)
+        return
+    with ThreadPoolExecutor(max_workers=min(MOVE_WORKERS, len(moves))) as executor:
+        list(executor.map(lambda move: move_file(*move), moves))
 
 def move_contents(src_dir, dst_dir):
     """
     Move all files from src_dir to dst_dir and delete src_dir if empty.
     """
     os.makedirs(dst_dir, exist_ok=True)
-    for item in os.listdir(src_dir):
-        src_item = os.path.join(src_dir, item)
-        dst_item = os.path.join(dst_dir, item)
-        if os.path.isfile(src_item):
-            try:
-                shutil.move(src_item, dst_item)
-            except FileNotFoundError:
-                pass
+    with os.scandir(src_dir) as entries:
+        moves = [(entry.path, os.path.join(dst_dir, entry.name)) for entry in entries if entry.is_file()]
+    move_files(moves)
     delete_if_empty(src_dir)
 
 def confirm_close(root, progress):
@@ -195,10 +391,12 @@ def confirm_close(root, progress):
             return
     root.destroy()
 
-def main():
+def main(initial_folder=None):
     """
     Launch the Tkinter GUI for sorting stereo image pairs and optionally moving them.
+    If 'initial_folder' is a directory it is preselected, otherwise the last used folder is.
     """
+    Tk, Label, Button, Listbox, END, StringVar = tk.Tk, tk.Label, tk.Button, tk.Listbox, tk.END, tk.StringVar
     root = Tk()
     root.title("pair3d - Stereo Image Sorter")
     root.configure(bg="lightcoral")
@@ -217,7 +415,10 @@ def main():
     if os.path.exists(icon_path):
         root.iconbitmap(icon_path)
 
-    selected_folder = {"path": load_last_folder()}
+    if initial_folder and os.path.isdir(initial_folder):
+        selected_folder = {"path": os.path.abspath(initial_folder)}
+    else:
+        selected_folder = {"path": load_last_folder()}
     style = ttk.Style()
     style.configure("TCheckbutton", background="lightcoral", foreground="blue")
     style.configure("TRadiobutton", background="lightcoral", foreground="blue")
@@ -481,88 +682,154 @@ def main():
         app_log_file = os.path.join(get_app_dir(), "pair3d_log.txt")
         src_log_file = os.path.join(folder, "pair3d_log.txt")
 
+        # Log files stay open (buffered) for the run instead of being reopened per message
+        log_paths = {"app": app_log_file, "source": src_log_file}
+        log_handles = {}
+
         def log(msg):
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             log_message = f"[{timestamp}] {msg}\n"
-            try:
-                with open(app_log_file, "a", encoding="utf-8") as f:
-                    f.write(log_message)
-            except Exception as e:
-                print(f"Failed to write to app log: {e}")
-            try:
-                with open(src_log_file, "a", encoding="utf-8") as f:
-                    f.write(log_message)
-            except Exception as e:
-                print(f"Failed to write to source log: {e}")
+            for name, path in log_paths.items():
+                try:
+                    handle = log_handles.get(name)
+                    if handle is None:
+                        handle = log_handles[name] = open(path, "a", encoding="utf-8", buffering=65536)
+                    handle.write(log_message)
+                except Exception as e:
+                    print(f"Failed to write to {name} log: {e}")
+
+        def close_logs():
+            for handle in log_handles.values():
+                try:
+                    handle.close()
+                except Exception as e:
+                    print(f"Failed to close log: {e}")
+            log_handles.clear()
 
         def task():
+            try:
+                run_task()
+            finally:
+                close_logs()
+
+        def run_task():
+            import imagehash
+            import numpy as np
             start_time = time.time()
             include_singles = reprocess_singles_var.get() == "1"
+            scanned_mtimes = {}
             folders_dict = get_image_files_by_folder(
-                folder, recursive=(process_subfolders_var.get() == "1"), include_singles=include_singles
+                folder, recursive=(process_subfolders_var.get() == "1"), include_singles=include_singles,
+                mtimes=scanned_mtimes
             )
             image_files = [f for files in folders_dict.values() for f in files]
             total_files = len(image_files)
             root.after(0, update_progress, 0, 0, None, 0, total_files)
 
             processed = [0]
+            last_emit = [0.0, None]  # time and value of the last UI update
             def progress_callback(value):
                 now = time.time()
-                elapsed = max(0, now - start_time - total_paused_time[0])
                 processed_count = int((value / 100) * total_files)
                 processed[0] = processed_count
+                # Only redraw when the percentage changes, at most ~30 times a second
+                if value == last_emit[1] or (value < 100 and now - last_emit[0] < 0.033):
+                    return
+                last_emit[0] = now
+                last_emit[1] = value
+                elapsed = max(0, now - start_time - total_paused_time[0])
                 remaining = ((elapsed / value) * (100 - value)) if value > 0 else -1
                 root.after(0, update_progress, value, elapsed, remaining, processed_count, total_files)
 
             # Sorting Phase
-            image_files.sort(key=lambda x: get_image_timestamp(x) or datetime.min)
-            used = set()
-            pairs = []
-            for i, path1 in enumerate(image_files):
-                if path1 in used:
-                    continue
-                time1 = get_image_timestamp(path1)
-                if time1 is None:
-                    continue
-                for path2 in image_files[i+1:]:
-                    if path2 in used:
-                        continue
-                    time2 = get_image_timestamp(path2)
-                    if time2 and abs((time2 - time1).total_seconds()) <= TIME_DIFF_THRESHOLD:
-                        if is_similar_image(path1, path2):
-                            pairs.append((path1, path2))
-                            used.add(path1)
-                            used.add(path2)
-                            break
-                while not pause_event.is_set():
-                    time.sleep(0.1)
-                progress_callback(min(100, int((i / len(image_files)) * 100)))
-
-            # Move files to _pairs or _singles
-            for pair in pairs:
-                for file in pair:
-                    subdir = os.path.dirname(file)
-                    dest_dir = os.path.join(subdir, "_pairs")
-                    os.makedirs(dest_dir, exist_ok=True)
-                    try:
-                        shutil.move(file, os.path.join(dest_dir, os.path.basename(file)))
-                    except FileNotFoundError:
-                        pass
-
-            for file in image_files:
-                if file not in used:
-                    subdir = os.path.dirname(file)
-                    if os.path.basename(subdir) == "_singles":
-                        continue
-                    dest_dir = os.path.join(subdir, "_singles")
+            # Stat each file once; unreadable files sort first and are never paired
+            timed = sorted(
+                ((scanned_mtimes[f] if f in scanned_mtimes else get_image_mtime(f), f) for f in image_files),
+                key=lambda item: item[0] if item[0] is not None else float("-inf"),
+            )
+            mtimes = [t for t, _ in timed]
+            image_files = [f for _, f in timed]
+
+            # Hash each image once up front (first half of the progress bar)
+            hashes = {}
+            dhashes = {}
+            sizes = {}
+            with ProcessPoolExecutor() as executor:
+                results = executor.map(_phash_worker, image_files, chunksize=16)
+                for i, (path, h, dh, size) in enumerate(results):
+                    hashes[path] = imagehash.hex_to_hash(h) if h else None
+                    dhashes[path] = int(dh, 16) if dh else 0
+                    sizes[path] = size
+                    pause_event.wait()
+                    progress_callback(min(50, int((i / len(image_files)) * 50)))
+
+            # Files are sorted by time, so candidates for a pair lie in a short
+            # window after each file; stop scanning once the window is passed.
+            n = len(image_files)
+            has_hash = [hashes.get(f) is not None for f in image_files]
+            hash_values = np.array(
+                [int(str(hashes[f]), 16) if ok else 0 for f, ok in zip(image_files, has_hash)],
+                dtype=np.uint64,
+            )
+            dhash_values = np.array([dhashes.get(f, 0) for f in image_files], dtype=np.uint64)
+            used = bytearray(n)
+            num_pairs = 0
+            # Moves are queued on a thread pool as soon as a pair is found, so disk I/O
+            # overlaps with the rest of the search; each destination folder is created once.
+            created_dirs = set()
+            move_futures = []
+
+            def queue_move(file, dest_dir):
+                if dest_dir not in created_dirs:
                     os.makedirs(dest_dir, exist_ok=True)
-                    try:
-                        shutil.move(file, os.path.join(dest_dir, os.path.basename(file)))
-                    except FileNotFoundError:
-                        pass
+                    created_dirs.add(dest_dir)
+                move_futures.append(move_pool.submit(move_file, file, os.path.join(dest_dir, os.path.basename(file))))
 
-            num_pairs = len(pairs)
-            num_singles = len(image_files) - len(used)
+            move_pool = ThreadPoolExecutor(max_workers=MOVE_WORKERS)
+            try:
+                for i, path1 in enumerate(image_files):
+                    if used[i]:
+                        continue
+                    time1 = mtimes[i]
+                    if time1 is None or not has_hash[i]:
+                        continue
+                    window_end = bisect_right(mtimes, time1 + TIME_DIFF_THRESHOLD, lo=i + 1)
+                    if window_end <= i + 1:
+                        continue
+                    # Loose dhash pre-filter, then phash only for the survivors (one vectorised popcount each)
+                    window = np.arange(i + 1, window_end)
+                    window = window[hamming_distances(dhash_values[i], dhash_values[window]) <= HASH_DIFF_THRESHOLD * 2]
+                    if not window.size:
+                        continue
+                    dists = hamming_distances(hash_values[i], hash_values[window])
+                    for j in window[dists < HASH_DIFF_THRESHOLD]:
+                        j = int(j)
+                        path2 = image_files[j]
+                        # Stereo pairs share a shape, so a size check rejects most candidates cheaply
+                        if used[j] or not has_hash[j] or not is_same_aspect(sizes.get(path1), sizes.get(path2)):
+                            continue
+                        used[i] = 1
+                        used[j] = 1
+                        num_pairs += 1
+                        queue_move(path1, os.path.join(os.path.dirname(path1), "_pairs"))
+                        queue_move(path2, os.path.join(os.path.dirname(path2), "_pairs"))
+                        break
+                    pause_event.wait()
+                    progress_callback(min(100, 50 + int((i / len(image_files)) * 50)))
+
+                # Everything left unpaired goes to _singles
+                for k, file in enumerate(image_files):
+                    if not used[k]:
+                        subdir = os.path.dirname(file)
+                        if os.path.basename(subdir) == "_singles":
+                            continue
+                        queue_move(file, os.path.join(subdir, "_singles"))
+            finally:
+                move_pool.shutdown(wait=True)
+            for future in move_futures:
+                future.result()
+
+            num_singles = len(image_files) - 2 * num_pairs
             root.after(0, listbox_results.delete, 0, END)
             root.after(0, listbox_results.insert, END, f"Pairs moved: {num_pairs}")
             root.after(0, listbox_results.insert, END, f"Singles moved: {num_singles}")
@@ -600,9 +867,9 @@ def main():
                 log(f"Processing from: {src_root}")
                 log(f"Duplicated tree will be at: {dst_root}")
 
-                for dirpath, _, _ in os.walk(src_root, topdown=False):
-                    # Count files before moving
-                    file_count = len(get_image_files(dirpath, include_singles=True))
+                for dirpath, _, filenames in os.walk(src_root, topdown=False):
+                    # Count files before moving, from the listing os.walk already read
+                    file_count = sum(1 for f in filenames if _is_image(f))
                     rel_path = os.path.relpath(dirpath, src_root)
                     parent_path = os.path.dirname(dirpath)
                     parent_rel = os.path.relpath(parent_path, src_root)
@@ -623,20 +890,25 @@ def main():
                         progress_callback(min(100, int((processed[0] / total_files) * 100) if total_files else 100))
 
                     delete_if_empty(dirpath)
-                    while not pause_event.is_set():
-                        time.sleep(0.1)
+                    pause_event.wait()
 
                 try:
+                    # The source log lives inside src_root; release it before moving the folder
+                    close_logs()
+                    log_paths.pop("source", None)
                     if os.path.exists(singles_root):
                         log(f"Warning: '{singles_root}' already exists, merging contents")
                         move_contents(src_root, singles_root)
                         shutil.rmtree(src_root)
                     else:
                         os.rename(src_root, singles_root)
+                    log_paths["source"] = os.path.join(singles_root, "pair3d_log.txt")
                     log(f"Renamed source root: {src_root} → {singles_root}")
                     root.after(0, lambda: selected_folder.update({"path": singles_root}))
                     save_last_folder(singles_root)
                 except Exception as e:
+                    if os.path.isdir(src_root):
+                        log_paths.setdefault("source", src_log_file)
                     log(f"Failed to rename source root to {singles_root}: {e}")
                     root.after(0, messagebox.showerror, "Error", f"Failed to rename source root to {singles_root}: {e}")
 
@@ -714,5 +986,21 @@ def main():
 
     root.mainloop()
 
+def cli_main(argv=None):
+    """
+    Console entry point: parse arguments using only the stdlib, then launch the GUI.
+    '--help' and '--version' exit before Tk or the imaging libraries are imported.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="pair3d-cli",
+        description="Sort stereo image pairs by timestamp proximity and perceptual similarity.",
+    )
+    parser.add_argument("folder", nargs="?", help="folder to open (default: the last used folder)")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    args = parser.parse_args(argv)
+    return main(args.folder)
+
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
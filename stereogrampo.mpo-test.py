@@ -42,22 +42,25 @@ import shutil
 import threading
 import time
 import logging
+import struct
 from tkinter import filedialog, messagebox, Tk, Label, Button, Listbox, END, StringVar, Canvas, Scrollbar
 from tkinter import ttk
 from datetime import datetime
 from PIL import Image
 import cv2
 import numpy as np
-import imagehash
 import piexif
 from io import BytesIO
-import exiftool
-import subprocess
-from uuid import uuid4
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 
 # Constants
 TIME_DIFF_THRESHOLD = 2  # Seconds for timestamp-based pairing
 HASH_DIFF_THRESHOLD = 10  # Perceptual hash difference threshold
+ALIGN_MAX_DIM = 1280  # Longest side used for feature detection in align_images
+# MAGSAC++ (OpenCV 4.5+) converges in far fewer iterations than classic RANSAC
+HOMOGRAPHY_METHOD = getattr(cv2, "USAC_MAGSAC", cv2.RANSAC)
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png"})
 
 # Get the application directory
 def get_app_dir():
@@ -117,6 +120,17 @@ def save_last_folder(folder):
     except Exception as e:
         logging.error(f"Failed to save last folder: {e}")
 
+def is_image_file(name):
+    """
+    Check a file name against IMAGE_EXTENSIONS, case-insensitively.
+    Args:
+        name (str): File name or path.
+    Returns:
+        bool: True for .jpg, .jpeg and .png files.
+    """
+    i = name.rfind(".")
+    return i != -1 and name[i:].lower() in IMAGE_EXTENSIONS
+
 def get_image_files(directory, recursive=False):
     """
     Retrieve image files from the directory, skipping '_3d_' folders.
@@ -130,16 +144,17 @@ def get_image_files(directory, recursive=False):
     if recursive:
         for root, dirs, files in os.walk(directory):
             dirs[:] = [d for d in dirs if not d.startswith("_3d_")]
-            for f in files:
-                if f.lower().endswith((".jpg", ".jpeg", ".png")):
-                    image_files.append(os.path.join(root, f))
+            image_files.extend(
+                os.path.join(root, f) for f in files if is_image_file(f)
+            )
     else:
-        image_files = [
-            os.path.join(directory, f)
-            for f in os.listdir(directory)
-            if f.lower().endswith((".jpg", ".jpeg", ".png"))
-            and os.path.isfile(os.path.join(directory, f))
-        ]
+        # DirEntry caches the file type, so no extra stat per entry
+        with os.scandir(directory) as it:
+            image_files = [
+                e.path
+                for e in it
+                if is_image_file(e.name) and e.is_file()
+            ]
     return image_files
 
 def get_image_files_by_folder(directory, recursive=False):
@@ -159,7 +174,7 @@ def get_image_files_by_folder(directory, recursive=False):
             image_files = [
                 os.path.join(root, f)
                 for f in files
-                if f.lower().endswith((".jpg", ".jpeg", ".png"))
+                if is_image_file(f)
             ]
             if image_files:
                 if os.path.basename(root).lower() == "_pairs":
@@ -189,6 +204,107 @@ def get_image_timestamp(path):
         logging.error(f"Failed to get timestamp for {path}: {e}")
         return None
 
+def phash_cv2(path):
+    """
+    Compute a 64-bit perceptual hash with OpenCV: grayscale decode, 32x32 area resize, 8x8 low-frequency DCT.
+    Args:
+        path (str): Path to the image file.
+    Returns:
+        int or None: The hash packed into an int, or None if the image cannot be read.
+    """
+    img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        return None
+    img = cv2.resize(img, (32, 32), interpolation=cv2.INTER_AREA)
+    dct = cv2.dct(np.float32(img))[:8, :8]
+    bits = (dct > np.median(dct)).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+# Perceptual hashes keyed by (path, mtime_ns, size), so each file is decoded once per run
+_PHASH_CACHE = {}
+
+def get_phash(path):
+    """
+    Return the cached phash for a file, computing it with phash_cv2 on first use.
+    Args:
+        path (str): Path to the image file.
+    Returns:
+        int or None: The 64-bit hash, or None if the file cannot be read.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (path, st.st_mtime_ns, st.st_size)
+    if key not in _PHASH_CACHE:
+        _PHASH_CACHE[key] = phash_cv2(path)
+    return _PHASH_CACHE[key]
+
+def hamming_distance(a, b):
+    """
+    Count the differing bits between two integer hashes.
+    Args:
+        a (int): First hash.
+        b (int): Second hash.
+    Returns:
+        int: Number of differing bits.
+    """
+    return _popcount(a ^ b)
+
+# int.bit_count is a single POPCNT on Python 3.10+; older interpreters count the binary string
+_popcount = getattr(int, "bit_count", None) or (lambda x: bin(x).count("1"))
+
+class BKTree:
+    """
+    BK-tree over integer hashes for Hamming-radius lookups.
+    """
+
+    def __init__(self):
+        self._root = None
+
+    def add(self, value, item):
+        """
+        Insert an integer hash with an associated item.
+        Args:
+            value (int): The hash.
+            item: Payload returned by find() (e.g. an index into a file list).
+        """
+        node = (value, item, {})
+        if self._root is None:
+            self._root = node
+            return
+        current = self._root
+        while True:
+            distance = hamming_distance(value, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def find(self, value, radius):
+        """
+        Find items whose hash is within 'radius' bits of 'value'.
+        Args:
+            value (int): The hash to search around.
+            radius (int): Maximum Hamming distance (inclusive).
+        Returns:
+            list: Items of all matching entries, in no particular order.
+        """
+        results = []
+        if self._root is None:
+            return results
+        stack = [self._root]
+        while stack:
+            node_value, item, children = stack.pop()
+            distance = hamming_distance(value, node_value)
+            if distance <= radius:
+                results.append(item)
+            for child_distance, child in children.items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        return results
+
 def is_similar_image(file1, file2):
     """
     Determine if two images are perceptually similar using phash.
@@ -199,15 +315,34 @@ def is_similar_image(file1, file2):
         bool: True if images are similar within the hash threshold.
     """
     try:
-        with Image.open(file1) as img1, Image.open(file2) as img2:
-            hash1 = imagehash.phash(img1)
-            hash2 = imagehash.phash(img2)
-        logging.info(f"Hash difference for {file1} and {file2}: {abs(hash1 - hash2)}")
-        return abs(hash1 - hash2) < HASH_DIFF_THRESHOLD
+        hash1 = get_phash(file1)
+        hash2 = get_phash(file2)
+        if hash1 is None or hash2 is None:
+            logging.error(f"Failed to read images for comparison: {file1}, {file2}")
+            return False
+        diff = hamming_distance(hash1, hash2)
+        logging.info(f"Hash difference for {file1} and {file2}: {diff}")
+        return diff < HASH_DIFF_THRESHOLD
     except Exception as e:
         logging.error(f"Failed to compare images {file1} and {file2}: {e}")
         return False
 
+# ORB detector and FLANN matcher, created on first use in each (worker) process and then reused
+_ALIGN_TOOLS = None
+
+def get_align_tools():
+    """
+    Return the per-process ORB detector and FLANN matcher used by align_images.
+    Returns:
+        tuple: (cv2.ORB, cv2.FlannBasedMatcher)
+    """
+    global _ALIGN_TOOLS
+    if _ALIGN_TOOLS is None:
+        # FLANN with an LSH index for binary ORB descriptors
+        index_params = dict(algorithm=6, table_number=6, key_size=12, multi_probe_level=1)  # 6 = FLANN_INDEX_LSH
+        _ALIGN_TOOLS = (cv2.ORB_create(), cv2.FlannBasedMatcher(index_params, dict(checks=50)))
+    return _ALIGN_TOOLS
+
 def align_images(left_path, right_path):
     """
     Align two images by detecting rotation needed to make them horizontally level.
@@ -215,25 +350,40 @@ def align_images(left_path, right_path):
         left_path (str): Path to the left image.
         right_path (str): Path to the right image.
     Returns:
-        tuple: Aligned (left_image, right_image) as PIL Images, or None if alignment fails.
+        tuple: Aligned (left_image, right_image) as BGR numpy arrays, or None if alignment fails.
     """
     try:
-        left_img = cv2.imread(left_path, cv2.IMREAD_GRAYSCALE)
-        right_img = cv2.imread(right_path, cv2.IMREAD_GRAYSCALE)
-        if left_img is None or right_img is None:
+        # Decode each file once; the grayscale copies feed ORB, the colour ones the output
+        left_bgr = cv2.imread(left_path, cv2.IMREAD_COLOR)
+        right_bgr = cv2.imread(right_path, cv2.IMREAD_COLOR)
+        if left_bgr is None or right_bgr is None:
             logging.error(f"Failed to load images for alignment: {left_path}, {right_path}")
             return None
+        left_img = cv2.cvtColor(left_bgr, cv2.COLOR_BGR2GRAY)
+        right_img = cv2.cvtColor(right_bgr, cv2.COLOR_BGR2GRAY)
+
+        # Detect features on downscaled copies; the homography is scaled back up afterwards
+        scale = min(1.0, ALIGN_MAX_DIM / max(left_img.shape[:2]))
+        if scale < 1.0:
+            left_small = cv2.resize(left_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            right_small = cv2.resize(right_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        else:
+            left_small, right_small = left_img, right_img
 
-        orb = cv2.ORB_create()
-        keypoints1, descriptors1 = orb.detectAndCompute(left_img, None)
-        keypoints2, descriptors2 = orb.detectAndCompute(right_img, None)
+        orb, flann = get_align_tools()
+        keypoints1, descriptors1 = orb.detectAndCompute(left_small, None)
+        keypoints2, descriptors2 = orb.detectAndCompute(right_small, None)
 
         if descriptors1 is None or descriptors2 is None:
             logging.error(f"No descriptors found for {left_path}, {right_path}")
             return None
 
-        bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
-        matches = bf.match(descriptors1, descriptors2)
+        # Lowe's ratio test stands in for crossCheck
+        knn_matches = flann.knnMatch(descriptors1, descriptors2, k=2)
+        matches = [
+            pair[0] for pair in knn_matches
+            if len(pair) == 2 and pair[0].distance < 0.75 * pair[1].distance
+        ]
         matches = sorted(matches, key=lambda x: x.distance)
 
         if len(matches) < 10:
@@ -243,20 +393,21 @@ def align_images(left_path, right_path):
         points1 = np.float32([keypoints1[m.queryIdx].pt for m in matches]).reshape(-1, 1, 2)
         points2 = np.float32([keypoints2[m.trainIdx].pt for m in matches]).reshape(-1, 1, 2)
 
-        H, _ = cv2.findHomography(points2, points1, cv2.RANSAC, 5.0)
+        H, _ = cv2.findHomography(points2, points1, HOMOGRAPHY_METHOD, 5.0, maxIters=500, confidence=0.999)
         if H is None:
             logging.error(f"Homography estimation failed for {left_path}, {right_path}")
             return None
-
-        left_pil = Image.open(left_path).convert('RGB')
-        right_pil = Image.open(right_path).convert('RGB')
-        right_np = np.array(right_pil)
+        if scale < 1.0:
+            H = np.diag([1 / scale, 1 / scale, 1.0]) @ H @ np.diag([scale, scale, 1.0])
 
         h, w = left_img.shape
-        aligned_right_np = cv2.warpPerspective(right_np, H, (w, h))
+        # Pairs shot moments apart are almost never projective; skip the per-pixel divide when H is affine
+        if abs(H[2, 0]) < 1e-6 and abs(H[2, 1]) < 1e-6 and abs(H[2, 2] - 1.0) < 1e-3:
+            aligned_right_bgr = cv2.warpAffine(right_bgr, H[:2] / H[2, 2], (w, h), flags=cv2.INTER_LINEAR)
+        else:
+            aligned_right_bgr = cv2.warpPerspective(right_bgr, H, (w, h))
 
-        aligned_right = Image.fromarray(aligned_right_np)
-        return left_pil, aligned_right
+        return left_bgr, aligned_right_bgr
     except Exception as e:
         logging.error(f"Alignment failed for {left_path}, {right_path}: {e}")
         return None
@@ -265,19 +416,17 @@ def create_anaglyph(left_img, right_img):
     """
     Create a red+cyan anaglyph stereogram from two images.
     Args:
-        left_img (PIL.Image): Left image.
-        right_img (PIL.Image): Right image.
+        left_img (numpy.ndarray): Left image, BGR.
+        right_img (numpy.ndarray): Right image, BGR.
     Returns:
-        PIL.Image: Anaglyph image.
+        numpy.ndarray: Anaglyph image, BGR.
     """
     try:
-        left_np = np.array(left_img)
-        right_np = np.array(right_img)
-        anaglyph = np.zeros_like(left_np)
-        anaglyph[:, :, 0] = left_np[:, :, 0]  # Red channel from left
-        anaglyph[:, :, 1] = right_np[:, :, 1]  # Green channel from right
-        anaglyph[:, :, 2] = right_np[:, :, 2]  # Blue channel from right
-        return Image.fromarray(anaglyph)
+        # Green and blue come from the right image, so start from a copy of it
+        # and only overwrite the red channel (index 2 in BGR) from the left
+        anaglyph = right_img.copy()
+        anaglyph[:, :, 2] = left_img[:, :, 2]
+        return anaglyph
     except Exception as e:
         logging.error(f"Failed to create anaglyph: {e}")
         return None
@@ -286,21 +435,17 @@ def create_side_by_side(left_img, right_img, reverse=False):
     """
     Create a side-by-side stereogram, optionally reversed (crossview).
     Args:
-        left_img (PIL.Image): Left image.
-        right_img (PIL.Image): Right image.
+        left_img (numpy.ndarray): Left image, BGR.
+        right_img (numpy.ndarray): Right image, BGR.
         reverse (bool): If True, create reversed (crossview) side-by-side.
     Returns:
-        PIL.Image: Side-by-side image.
+        numpy.ndarray: Side-by-side image, BGR.
     """
     try:
-        w, h = left_img.size
-        sbs = Image.new('RGB', (w * 2, h))
-        if reverse:
-            sbs.paste(right_img, (0, 0))
-            sbs.paste(left_img, (w, 0))
-        else:
-            sbs.paste(left_img, (0, 0))
-            sbs.paste(right_img, (w, 0))
+        h, w = left_img.shape[:2]
+        sbs = np.empty((h, w * 2, 3), dtype=np.uint8)
+        sbs[:, :w] = right_img if reverse else left_img
+        sbs[:, w:] = left_img if reverse else right_img
         return sbs
     except Exception as e:
         logging.error(f"Failed to create side-by-side (reverse={reverse}): {e}")
@@ -310,26 +455,165 @@ def create_left_right_left(left_img, right_img):
     """
     Create a left-right-left stereogram.
     Args:
-        left_img (PIL.Image): Left image.
-        right_img (PIL.Image): Right image.
+        left_img (numpy.ndarray): Left image, BGR.
+        right_img (numpy.ndarray): Right image, BGR.
     Returns:
-        PIL.Image: Left-right-left image.
+        numpy.ndarray: Left-right-left image, BGR.
     """
     try:
-        w, h = left_img.size
-        lrl = Image.new('RGB', (w * 3, h))
-        lrl.paste(left_img, (0, 0))
-        lrl.paste(right_img, (w, 0))
-        lrl.paste(left_img, (w * 2, 0))
+        h, w = left_img.shape[:2]
+        lrl = np.empty((h, w * 3, 3), dtype=np.uint8)
+        lrl[:, :w] = left_img
+        lrl[:, w:w * 2] = right_img
+        lrl[:, w * 2:] = left_img
         return lrl
     except Exception as e:
         logging.error(f"Failed to create left-right-left: {e}")
         return None
 
+def save_jpeg(path, img, quality=95):
+    """
+    Encode a BGR image as an optimized JPEG with OpenCV and write it to disk.
+    Args:
+        path (str): Output file path.
+        img (numpy.ndarray): Image to save, BGR.
+        quality (int): JPEG quality (0-100).
+    Returns:
+        bool: True if the file was written.
+    """
+    # imencode + open() rather than cv2.imwrite, which cannot open non-ASCII paths on Windows
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 1])
+    if not ok:
+        logging.error(f"JPEG encoding failed for {path}")
+        return False
+    with open(path, "wb") as f:
+        f.write(buf)
+    return True
+
+def build_mpf_segment(first_size, second_size, second_offset):
+    """
+    Build the APP2 MPF segment (CIPA DC-007) describing a two-image stereo MPO.
+    Args:
+        first_size (int): Size in bytes of the first image, including this segment.
+        second_size (int): Size in bytes of the second image.
+        second_offset (int): Offset of the second image, counted from the MPF endian marker.
+    Returns:
+        bytes: The APP2 segment, marker included (MPF_SEGMENT_SIZE bytes).
+    """
+    # Layout after the 'MPF\0' identifier, big-endian TIFF style:
+    # header (8) | MP Index IFD, 3 tags (42) | MP Attribute IFD, 1 tag (18) | MP Entries (32)
+    index_ifd_offset = 8
+    attr_ifd_offset = index_ifd_offset + 2 + 3 * 12 + 4
+    entries_offset = attr_ifd_offset + 2 + 1 * 12 + 4
+    entries = (
+        # Left: representative image, multi-frame disparity type, offset 0 by definition
+        struct.pack(">IIIHH", 0x20020002, first_size, 0, 0, 0) +
+        # Right: multi-frame disparity type
+        struct.pack(">IIIHH", 0x00020002, second_size, second_offset, 0, 0)
+    )
+    tiff = (
+        b"MM\x00\x2a" + struct.pack(">I", index_ifd_offset) +
+        struct.pack(">H", 3) +
+        struct.pack(">HHI4s", 0xB000, 7, 4, b"0100") +  # MPFVersion
+        struct.pack(">HHII", 0xB001, 4, 1, 2) +  # NumberOfImages
+        struct.pack(">HHII", 0xB002, 7, len(entries), entries_offset) +  # MPEntry
+        struct.pack(">I", attr_ifd_offset) +
+        struct.pack(">H", 1) +
+        struct.pack(">HHII", 0xB101, 4, 1, 1) +  # MPIndividualNum
+        struct.pack(">I", 0) +
+        entries
+    )
+    payload = b"MPF\x00" + tiff
+    return struct.pack(">HH", 0xFFE2, len(payload) + 2) + payload
+
+MPF_SEGMENT_SIZE = len(build_mpf_segment(0, 0, 0))
+
+def read_jpeg_head(jpeg_file):
+    """
+    Read the SOI marker and any APP0 (JFIF) / APP1 (Exif) segments at the start of a JPEG.
+    The file is left positioned just after them, so the rest can be streamed.
+    Args:
+        jpeg_file (file): JPEG opened in binary mode, positioned after the SOI marker.
+    Returns:
+        bytes: SOI plus the APP0/APP1 segments.
+    """
+    head = b"\xff\xd8"
+    while True:
+        marker = jpeg_file.read(4)
+        if len(marker) < 4 or marker[:2] not in (b"\xff\xe0", b"\xff\xe1"):
+            jpeg_file.seek(len(head))
+            return head
+        (seg_len,) = struct.unpack(">H", marker[2:])
+        head += marker + jpeg_file.read(seg_len - 2)
+
+def iter_head_segments(head):
+    """
+    Yield (marker, payload) for each segment in a JPEG head.
+    Args:
+        head (bytes): JPEG head from read_jpeg_head().
+    """
+    pos = 2
+    while pos + 4 <= len(head):
+        (seg_len,) = struct.unpack(">H", head[pos + 2:pos + 4])
+        yield head[pos + 1], head[pos + 4:pos + 2 + seg_len]
+        pos += 2 + seg_len
+
+def get_exif_timestamp(head):
+    """
+    Return DateTimeOriginal from the Exif segment of a JPEG head, if it has one.
+    Args:
+        head (bytes): JPEG head from read_jpeg_head().
+    Returns:
+        bytes or None: The 'YYYY:MM:DD HH:MM:SS' timestamp.
+    """
+    for marker, data in iter_head_segments(head):
+        if marker == 0xE1 and data.startswith(b"Exif\x00\x00"):
+            try:
+                return piexif.load(data)["Exif"].get(piexif.ExifIFD.DateTimeOriginal)
+            except Exception:
+                return None
+    return None
+
+def normalize_exif_head(head, timestamp):
+    """
+    Set DateTime, DateTimeOriginal and DateTimeDigitized to one timestamp and YCbCrPositioning
+    to co-sited in the Exif segment of a JPEG head, adding the segment if there is none.
+    StereoPhoto Maker expects both MPO frames to agree on these.
+    Args:
+        head (bytes): JPEG head from read_jpeg_head().
+        timestamp (bytes): 'YYYY:MM:DD HH:MM:SS' timestamp.
+    Returns:
+        bytes: The head with the patched Exif segment; unchanged if the Exif cannot be parsed.
+    """
+    segments = list(iter_head_segments(head))
+    index = next(
+        (i for i, (marker, data) in enumerate(segments) if marker == 0xE1 and data.startswith(b"Exif\x00\x00")),
+        None
+    )
+    try:
+        exif = piexif.load(segments[index][1]) if index is not None else {"0th": {}, "Exif": {}}
+        exif["0th"][piexif.ImageIFD.DateTime] = timestamp
+        exif["0th"][piexif.ImageIFD.YCbCrPositioning] = 2  # Co-sited
+        exif["Exif"][piexif.ExifIFD.DateTimeOriginal] = timestamp
+        exif["Exif"][piexif.ExifIFD.DateTimeDigitized] = timestamp
+        data = piexif.dump(exif)
+    except Exception as e:
+        logger.warning(f"Could not normalize Exif, leaving it unchanged: {e}")
+        return head
+    if index is None:
+        # Exif goes after JFIF, if the file has one
+        index = 1 if segments and segments[0][0] == 0xE0 else 0
+        segments.insert(index, (0xE1, data))
+    else:
+        segments[index] = (0xE1, data)
+    return b"\xff\xd8" + b"".join(
+        struct.pack(">BBH", 0xFF, marker, len(payload) + 2) + payload for marker, payload in segments
+    )
+
 def create_mpo_file(left_path, right_path, output_mpo_path):
     """
     Create an MPO file from two image paths with proper MPF structure for StereoPhoto Maker compatibility.
-    Adapted from create_mpo_gui.py to ensure functional MPO output.
+    The MPF APP2 segment is written directly into the left JPEG, followed by the right JPEG.
 
     Args:
         left_path (str): Path to the left image file.
@@ -339,9 +623,6 @@ def create_mpo_file(left_path, right_path, output_mpo_path):
     Returns:
         bool: True if MPO creation is successful, False otherwise.
     """
-    temp_left = None
-    temp_right = None
-    temp_mpo = None
     try:
         # Normalize paths
         left_path = os.path.normpath(left_path)
@@ -359,106 +640,153 @@ def create_mpo_file(left_path, right_path, output_mpo_path):
         if not os.access(output_dir, os.W_OK):
             logger.error(f"No write permission for output directory: {output_dir}")
             return False
-        logger.info(f"Ensured output directory exists and is writable: {output_dir}")
 
-        # Get sizes of input images
         left_size = os.path.getsize(left_path)
         right_size = os.path.getsize(right_path)
         logger.info(f"Image sizes - Left: {left_size} bytes, Right: {right_size} bytes")
 
-        # Create temporary copies of input files to avoid modifying originals
-        temp_left = os.path.join(output_dir, f"temp_left_{uuid4().hex}.jpg")
-        temp_right = os.path.join(output_dir, f"temp_right_{uuid4().hex}.jpg")
-        shutil.copy2(left_path, temp_left)
-        shutil.copy2(right_path, temp_right)
-        logger.info(f"Created temporary copies: {temp_left}, {temp_right}")
-
-        # Prepare MPF tags for SPM compatibility
-        mpf_tags = {
-            'MPF:MPFVersion': '0100',
-            'MPF:NumberOfImages': 2,
-            'MPF:MPEntry': (
-                # First image (left): Attribute (0x00000000 = primary), size, offset
-                b'\x00\x00\x00\x00' +
-                left_size.to_bytes(4, byteorder='big') +
-                b'\x00\x00\x00\x00' +  # Offset for first image (0)
-                b'\x00\x00\x00\x00' +  # Dependency (none)
-                # Second image (right): Attribute (0x00020000 = stereo right), size, offset
-                b'\x00\x02\x00\x00' +
-                right_size.to_bytes(4, byteorder='big') +
-                left_size.to_bytes(4, byteorder='big') +  # Offset for second image
-                b'\x00\x00\x00\x00'   # Dependency (none)
-            ),
-            'MPF:MPType': 'Baseline Stereo Image',
-            'EXIF:YCbCrPositioning': 'Co-Sited'  # Match FUJIFILM sample
-        }
-
-        # Create temporary concatenated file
-        temp_mpo = os.path.join(output_dir, f"temp_{uuid4().hex}.mpo")
-        with open(temp_mpo, 'wb') as mpo_file:
-            with open(temp_left, 'rb') as left_file:
-                mpo_file.write(left_file.read())
-            with open(temp_right, 'rb') as right_file:
-                mpo_file.write(right_file.read())
-        logger.info(f"Created temporary MPO file: {temp_mpo}")
-
-        # Use ExifTool to set MPF tags and create final MPO
-        with exiftool.ExifToolHelper() as et:
-            # Set consistent timestamps and YCbCrPositioning on temporary files
-            timestamp = datetime.now().strftime("%Y:%m:%d %H:%M:%S")
-            et.set_tags(
-                [temp_left, temp_right],
-                {
-                    'EXIF:DateTime': timestamp,
-                    'EXIF:DateTimeOriginal': timestamp,
-                    'EXIF:DateTimeDigitized': timestamp,
-                    'EXIF:YCbCrPositioning': 'Co-Sited'
-                },
-                params=["-overwrite_original"]
-            )
-            logger.info(f"Set consistent timestamps and YCbCrPositioning for {temp_left} and {temp_right}")
-
-            # Create MPO with MPF tags using subprocess for detailed error capture
-            cmd = [
-                "exiftool",
-                f"-MPF:MPFVersion={mpf_tags['MPF:MPFVersion']}",
-                f"-MPF:NumberOfImages={mpf_tags['MPF:NumberOfImages']}",
-                f"-MPF:MPEntry={mpf_tags['MPF:MPEntry'].hex()}",
-                f"-MPF:MPType={mpf_tags['MPF:MPType']}",
-                f"-EXIF:YCbCrPositioning={mpf_tags['EXIF:YCbCrPositioning']}",
-                f"-o",
-                output_mpo_path,
-                temp_mpo
-            ]
-            logger.info(f"Executing exiftool command: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                logger.error(f"ExifTool execution failed: {result.stderr}")
+        with open(left_path, "rb") as left_file, open(right_path, "rb") as right_file:
+            if left_file.read(2) != b"\xff\xd8" or right_file.read(2) != b"\xff\xd8":
+                logger.error(f"MPO needs JPEG input: {left_path}, {right_path}")
                 return False
 
-        # Verify MPO file exists
-        if not os.path.exists(output_mpo_path):
-            logger.error(f"MPO file was not created at {output_mpo_path}")
-            return False
-
-        # Log MPF tags for debugging
-        with exiftool.ExifToolHelper() as et:
-            tags = et.get_tags(output_mpo_path, ['MPF:All', 'EXIF:YCbCrPositioning'])
-            logger.info(f"MPO file tags: {tags}")
+            # MPF goes after any APP0 (JFIF) / APP1 (Exif) segments at the start of the file;
+            # only those are read into memory, the image data is streamed
+            left_head = read_jpeg_head(left_file)
+            right_head = read_jpeg_head(right_file)
+
+            # Both frames get the left frame's capture time, so the pair's timestamps match
+            timestamp = get_exif_timestamp(left_head) or datetime.now().strftime("%Y:%m:%d %H:%M:%S").encode()
+            new_left_head = normalize_exif_head(left_head, timestamp)
+            new_right_head = normalize_exif_head(right_head, timestamp)
+
+            # Offsets in MPF are relative to the endian marker, 8 bytes into the segment
+            first_size = left_size - len(left_head) + len(new_left_head) + MPF_SEGMENT_SIZE
+            second_size = right_size - len(right_head) + len(new_right_head)
+            second_offset = first_size - (len(new_left_head) + 8)
+            segment = build_mpf_segment(first_size, second_size, second_offset)
+
+            with open(output_mpo_path, "wb") as mpo_file:
+                mpo_file.write(new_left_head)
+                mpo_file.write(segment)
+                shutil.copyfileobj(left_file, mpo_file, 1024 * 1024)
+                mpo_file.write(new_right_head)
+                shutil.copyfileobj(right_file, mpo_file, 1024 * 1024)
+
+        # Read the MP index back, as a reader would, to check the file
+        with Image.open(output_mpo_path) as mpo:
+            if mpo.format != "MPO" or getattr(mpo, "n_frames", 1) != 2:
+                logger.error(f"MPO file has no valid MP index: {output_mpo_path}")
+                return False
 
         logger.info(f"Successfully created MPO file: {output_mpo_path}")
         return True
     except Exception as e:
         logger.error(f"Failed to create MPO file {output_mpo_path}: {str(e)}")
         return False
+
+# Single I/O thread per (worker) process for MPO writes, created on first use
+_MPO_WRITER = None
+
+def get_mpo_writer():
+    """
+    Return the per-process thread pool that runs create_mpo_file off the compute path.
+    Returns:
+        ThreadPoolExecutor: Executor with one worker thread.
+    """
+    global _MPO_WRITER
+    if _MPO_WRITER is None:
+        _MPO_WRITER = ThreadPoolExecutor(max_workers=1)
+    return _MPO_WRITER
+
+def process_pair(left_path, right_path, options):
+    """
+    Create the selected stereogram and MPO outputs for one stereo pair.
+    Runs in a worker process, so it takes only paths and plain option values.
+    Args:
+        left_path (str): Path to the left image.
+        right_path (str): Path to the right image.
+        options (dict): Output flags ('anaglyph', 'sbs', 'sbs_reverse', 'lrl', 'mpo') and 'output_root'.
+    Returns:
+        list or None: Paths of the files written, or None if the pair was skipped.
+    """
+    outputs = []
+    # Validate images
+    try:
+        with Image.open(left_path), Image.open(right_path):
+            pass
+    except Exception as e:
+        logging.error(f"Invalid image pair {left_path}, {right_path}: {e}")
+        return None
+
+    # Use base folder for output, not input subfolder structure
+    base_name = os.path.splitext(os.path.basename(left_path))[0]
+
+    # Perform alignment only if needed for stereogram outputs
+    left_img = None
+    right_img = None
+    if options["anaglyph"] or options["sbs"] or options["sbs_reverse"] or options["lrl"]:
+        aligned = align_images(left_path, right_path)
+        if aligned is None:
+            logging.error(f"Skipping pair {left_path}, {right_path} due to alignment failure")
+            return None
+        left_img, right_img = aligned
+
+    # The MPO only needs the source files, so write it on the background thread while the
+    # stereograms below are composed and encoded
+    mpo_future = None
+    if options["mpo"]:
+        mpo_path = os.path.join(options["output_root"], "mpo", f"{base_name}.mpo")
+        mpo_future = get_mpo_writer().submit(create_mpo_file, left_path, right_path, mpo_path)
+
+    try:
+        # Create selected output formats
+        if options["anaglyph"]:
+            output_dir = os.path.join(options["output_root"], "anaglyph")
+            output_name = f"rc_{base_name}.jpg"
+            output_path = os.path.join(output_dir, output_name)
+            result = create_anaglyph(left_img, right_img)
+            if result is not None and save_jpeg(output_path, result, quality=95):
+                outputs.append(output_path)
+                logging.info(f"Created anaglyph: {output_path}")
+
+        if options["sbs"]:
+            output_dir = os.path.join(options["output_root"], "sbs")
+            output_name = f"ii_{base_name}.jpg"
+            output_path = os.path.join(output_dir, output_name)
+            result = create_side_by_side(left_img, right_img, reverse=False)
+            if result is not None and save_jpeg(output_path, result, quality=95):
+                outputs.append(output_path)
+                logging.info(f"Created side-by-side: {output_path}")
+
+        if options["sbs_reverse"]:
+            output_dir = os.path.join(options["output_root"], "sbs_reverse")
+            output_name = f"xi_{base_name}.jpg"
+            output_path = os.path.join(output_dir, output_name)
+            result = create_side_by_side(left_img, right_img, reverse=True)
+            if result is not None and save_jpeg(output_path, result, quality=95):
+                outputs.append(output_path)
+                logging.info(f"Created reversed side-by-side: {output_path}")
+
+        if options["lrl"]:
+            output_dir = os.path.join(options["output_root"], "lrl")
+            output_name = f"lrl_{base_name}.jpg"
+            output_path = os.path.join(output_dir, output_name)
+            result = create_left_right_left(left_img, right_img)
+            if result is not None and save_jpeg(output_path, result, quality=95):
+                outputs.append(output_path)
+                logging.info(f"Created left-right-left: {output_path}")
     finally:
-        for temp_file in [temp_left, temp_right, temp_mpo]:
-            if temp_file and os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                    logger.info(f"Cleaned up temporary file: {temp_file}")
-                except Exception as e:
-                    logger.error(f"Failed to clean up temporary file {temp_file}: {str(e)}")
+        # Wait here even if a stereogram fails: the worker gives no chance to finish the write later
+        mpo_ok = mpo_future is not None and mpo_future.result()
+
+    if mpo_future is not None:
+        if mpo_ok:
+            outputs.append(mpo_path)
+        else:
+            logging.error(f"MPO creation failed for {mpo_path}")
+
+    return outputs
 
 def delete_empty_dirs(directory):
     """
@@ -943,22 +1271,30 @@ def main():
                 else:
                     for subfolder, files in pairs_folders.items():
                         files.sort(key=get_image_timestamp)
+                        timestamps = [get_image_timestamp(f) for f in files]
+                        hashes = [get_phash(f) for f in files]
+                        # Index hashes once so each image only looks at near neighbours
+                        tree = BKTree()
+                        for idx, h in enumerate(hashes):
+                            if h is not None:
+                                tree.add(h, idx)
                         used = set()
                         for i, path1 in enumerate(files):
-                            if path1 in used:
+                            if i in used or hashes[i] is None or timestamps[i] is None:
                                 continue
-                            time1 = get_image_timestamp(path1)
-                            for j in range(i + 1, len(files)):
-                                path2 = files[j]
-                                if path2 in used:
-                                    continue
-                                time2 = get_image_timestamp(path2)
+                            time1 = timestamps[i]
+                            candidates = sorted(
+                                j for j in tree.find(hashes[i], HASH_DIFF_THRESHOLD - 1) if j > i and j not in used
+                            )
+                            for j in candidates:
+                                time2 = timestamps[j]
                                 if time2 and abs((time2 - time1).total_seconds()) <= TIME_DIFF_THRESHOLD:
-                                    if is_similar_image(path1, path2):
-                                        pairs.append((path1, path2))
-                                        used.add(path1)
-                                        used.add(path2)
-                                        break
+                                    path2 = files[j]
+                                    logging.info(f"Hash difference for {path1} and {path2}: {hamming_distance(hashes[i], hashes[j])}")
+                                    pairs.append((path1, path2))
+                                    used.add(i)
+                                    used.add(j)
+                                    break
                 total_files = len(pairs)
                 singles_count = sum(len(files) for files in singles_folders.values())
 
@@ -966,88 +1302,48 @@ def main():
             root.after(0, lambda: label_total.config(text=f"Total pairs: {total_files}"))
             root.after(0, lambda: label_singles.config(text=f"Singles: {singles_count}"))
 
+            options = {
+                "anaglyph": anaglyph_var.get() == "1",
+                "sbs": sbs_var.get() == "1",
+                "sbs_reverse": sbs_reverse_var.get() == "1",
+                "lrl": lrl_var.get() == "1",
+                "mpo": mpo_output,
+                "output_root": output_root,
+            }
             processed = [0]
-            for i, (left_path, right_path) in enumerate(pairs):
-                while not pause_event.is_set():
-                    time.sleep(0.1)
 
-                # Validate images
+            def record(future):
                 try:
-                    with Image.open(left_path) as left_img, Image.open(right_path) as right_img:
-                        pass
+                    outputs = future.result()
                 except Exception as e:
-                    logging.error(f"Invalid image pair {left_path}, {right_path}: {e}")
-                    continue
-
-                # Use base folder for output, not input subfolder structure
-                base_name = os.path.splitext(os.path.basename(left_path))[0]
-
-                # Perform alignment only if needed for stereogram outputs
-                left_img = None
-                right_img = None
-                if any([anaglyph_var.get() == "1", sbs_var.get() == "1", sbs_reverse_var.get() == "1", lrl_var.get() == "1"]):
-                    aligned = align_images(left_path, right_path)
-                    if aligned is None:
-                        logging.error(f"Skipping pair {left_path}, {right_path} due to alignment failure")
-                        continue
-                    left_img, right_img = aligned
-
-                # Create selected output formats
-                if anaglyph_var.get() == "1":
-                    output_dir = os.path.join(output_root, "anaglyph")
-                    output_name = f"rc_{base_name}.jpg"
-                    output_path = os.path.join(output_dir, output_name)
-                    result = create_anaglyph(left_img, right_img)
-                    if result:
-                        result.save(output_path, quality=95)
-                        processed_files.append(output_path)
-                        logging.info(f"Created anaglyph: {output_path}")
-
-                if sbs_var.get() == "1":
-                    output_dir = os.path.join(output_root, "sbs")
-                    output_name = f"ii_{base_name}.jpg"
-                    output_path = os.path.join(output_dir, output_name)
-                    result = create_side_by_side(left_img, right_img, reverse=False)
-                    if result:
-                        result.save(output_path, quality=95)
-                        processed_files.append(output_path)
-                        logging.info(f"Created side-by-side: {output_path}")
-
-                if sbs_reverse_var.get() == "1":
-                    output_dir = os.path.join(output_root, "sbs_reverse")
-                    output_name = f"xi_{base_name}.jpg"
-                    output_path = os.path.join(output_dir, output_name)
-                    result = create_side_by_side(left_img, right_img, reverse=True)
-                    if result:
-                        result.save(output_path, quality=95)
-                        processed_files.append(output_path)
-                        logging.info(f"Created reversed side-by-side: {output_path}")
-
-                if lrl_var.get() == "1":
-                    output_dir = os.path.join(output_root, "lrl")
-                    output_name = f"lrl_{base_name}.jpg"
-                    output_path = os.path.join(output_dir, output_name)
-                    result = create_left_right_left(left_img, right_img)
-                    if result:
-                        result.save(output_path, quality=95)
-                        processed_files.append(output_path)
-                        logging.info(f"Created left-right-left: {output_path}")
-
-                if mpo_output:
-                    output_dir = os.path.join(output_root, "mpo")
-                    output_name = f"{base_name}.mpo"
-                    output_path = os.path.join(output_dir, output_name)
-                    if create_mpo_file(left_path, right_path, output_path):
-                        processed_files.append(output_path)
-                    else:
-                        logging.error(f"MPO creation failed for {output_path}")
-
+                    logging.error(f"Pair processing failed: {e}")
+                    return
+                if outputs is None:
+                    return
+                processed_files.extend(outputs)
                 processed[0] += 1
                 elapsed = max(0, time.time() - start_time - total_paused_time[0])
                 avg_time_per_file = elapsed / max(1, processed[0])
                 remaining = avg_time_per_file * (total_files - processed[0])
                 root.after(0, update_progress, (processed[0] / total_files) * 100 if total_files > 0 else 100, elapsed, remaining, processed[0], total_files)
 
+            # Pairs are independent, so they run in worker processes (the work is CPU-bound
+            # OpenCV/PIL code). Submissions are kept a little ahead of the workers so Pause
+            # still takes effect between pairs.
+            workers = os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                in_flight = set()
+                for left_path, right_path in pairs:
+                    while not pause_event.is_set():
+                        time.sleep(0.1)
+                    in_flight.add(executor.submit(process_pair, left_path, right_path, options))
+                    if len(in_flight) >= workers * 2:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            record(future)
+                for future in as_completed(in_flight):
+                    record(future)
+
             if delete_originals and processed_files:
                 if messagebox.askyesno("Confirm Delete", "Delete original files? This cannot be undone."):
                     for left_path, right_path in pairs:
@@ -1165,12 +1461,12 @@ if __name__ == "__main__":
         import cv2
         import numpy
         from PIL import Image
-        import imagehash
         import piexif
         from io import BytesIO
     except ImportError as e:
         print(f"Error: Missing required module: {e}")
         print("Please install the required modules using:")
-        print("pip install opencv-python Pillow imagehash piexif numpy")
+        print("pip install opencv-python Pillow piexif numpy")
         sys.exit(1)
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
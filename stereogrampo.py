@@ -38,10 +38,15 @@ import sys
 import os
 import shutil
 import threading
+import queue
 import time
 import logging
-from tkinter import filedialog, messagebox, Tk, Label, Button, Listbox, END, StringVar
+import sqlite3
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from tkinter import filedialog, messagebox, Tk, Label, Button, Listbox, END, StringVar, Variable
 from tkinter import ttk
+from contextlib import closing
 from datetime import datetime
 from PIL import Image
 import cv2
@@ -53,6 +58,19 @@ from io import BytesIO
 # Constants
 TIME_DIFF_THRESHOLD = 2  # Seconds for timestamp-based pairing
 HASH_DIFF_THRESHOLD = 10  # Perceptual hash difference threshold
+THUMB_HASH_FACTOR = 2  # Thumbnail dhash prefilter tolerance, as a multiple of HASH_DIFF_THRESHOLD
+ASPECT_TOLERANCE = 0.02  # Relative aspect-ratio difference above which a pair is rejected before phash
+# Encoder settings shared by every JPEG written (stereograms and MPO frames): baseline,
+# no extra Huffman optimisation pass, 4:2:0 chroma, favouring encode speed
+JPEG_SAVE_OPTIONS = {"quality": 95, "optimize": False, "progressive": False, "subsampling": "4:2:0"}
+MATCH_RATIO = 0.75  # Lowe ratio test: best match must beat the second best by this factor
+RIG_SYNC_TOLERANCE = 0.05  # Seconds between two rig cameras' shots for a pair to count as already aligned
+ALIGN_MAX_DIM = 1024  # Features are detected on images downscaled by an integer factor to about this size
+# Alignment uses OpenCV's CUDA module when the cv2 build has it and a device is present
+try:
+    HAS_CUDA = cv2.cuda.getCudaEnabledDeviceCount() > 0
+except (AttributeError, cv2.error):
+    HAS_CUDA = False
 
 # Get the application directory
 def get_app_dir():
@@ -106,6 +124,66 @@ def save_last_folder(folder):
     except Exception as e:
         logging.error(f"Failed to save last folder: {e}")
 
+# Directory scans keyed by (folder, recursive). Each entry also records the mtime of
+# every directory it listed, so a folder is only re-listed after something in it changed.
+_SCAN_CACHE = {}
+
+def _scan_image_folders(directory, recursive, folders, dir_mtimes):
+    """
+    List image files under a directory with os.scandir, skipping '_3d_' folders.
+    Args:
+        directory (str): Directory to list.
+        recursive (bool): Whether to descend into subdirectories.
+        folders (dict): Filled with folder path -> list of image file paths.
+        dir_mtimes (dict): Filled with folder path -> st_mtime_ns of every listed folder.
+    """
+    dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+    image_files = []
+    subdirs = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_dir():
+                if recursive and not entry.is_symlink() and not entry.name.startswith("_3d_"):
+                    subdirs.append(entry.path)
+            elif entry.name.lower().endswith((".jpg", ".jpeg", ".png")) and entry.is_file():
+                image_files.append(entry.path)
+    if image_files:
+        folders[directory] = image_files
+    for subdir in subdirs:
+        try:
+            _scan_image_folders(subdir, recursive, folders, dir_mtimes)
+        except OSError as e:
+            # os.walk skipped unreadable subfolders too
+            logging.warning(f"Skipping unreadable folder {subdir}: {e}")
+
+def _cached_image_folders(directory, recursive):
+    """
+    Return the folder -> image files mapping for a directory, reusing the last scan if unchanged.
+    Args:
+        directory (str): Root directory.
+        recursive (bool): Whether to include subfolders.
+    Returns:
+        dict: Mapping from folder path to list of image file paths (fresh lists, safe to sort).
+    """
+    key = (os.path.abspath(directory), recursive)
+    cached = _SCAN_CACHE.get(key)
+    if cached is not None:
+        folders, dir_mtimes = cached
+        try:
+            if all(os.stat(d).st_mtime_ns == m for d, m in dir_mtimes.items()):
+                return {d: list(files) for d, files in folders.items()}
+        except OSError:
+            pass
+    folders = {}
+    dir_mtimes = {}
+    _scan_image_folders(directory, recursive, folders, dir_mtimes)
+    _SCAN_CACHE[key] = (folders, dir_mtimes)
+    return {d: list(files) for d, files in folders.items()}
+
+def clear_scan_cache():
+    """Forget all cached directory scans."""
+    _SCAN_CACHE.clear()
+
 def get_image_files(directory, recursive=False):
     """
     Retrieve image files from the directory, skipping '_3d_' folders.
@@ -115,22 +193,7 @@ def get_image_files(directory, recursive=False):
     Returns:
         list: List of image file paths (.jpg, .jpeg, .png).
     """
-    image_files = []
-    skip_folders = ["_3d_anaglyph", "_3d_sbs", "_3d_lrl"]
-    if recursive:
-        for root, dirs, files in os.walk(directory):
-            dirs[:] = [d for d in dirs if not d.startswith("_3d_")]
-            for f in files:
-                if f.lower().endswith((".jpg", ".jpeg", ".png")):
-                    image_files.append(os.path.join(root, f))
-    else:
-        image_files = [
-            os.path.join(directory, f)
-            for f in os.listdir(directory)
-            if f.lower().endswith((".jpg", ".jpeg", ".png"))
-            and os.path.isfile(os.path.join(directory, f))
-        ]
-    return image_files
+    return [f for files in _cached_image_folders(directory, recursive).values() for f in files]
 
 def get_image_files_by_folder(directory, recursive=False):
     """
@@ -141,23 +204,7 @@ def get_image_files_by_folder(directory, recursive=False):
     Returns:
         dict: Mapping from folder path to list of image file paths.
     """
-    folders = {}
-    skip_folders = ["_3d_anaglyph", "_3d_sbs", "_3d_lrl"]
-    if recursive:
-        for root, dirs, files in os.walk(directory):
-            dirs[:] = [d for d in dirs if not d.startswith("_3d_")]
-            image_files = [
-                os.path.join(root, f)
-                for f in files
-                if f.lower().endswith((".jpg", ".jpeg", ".png"))
-            ]
-            if image_files:
-                folders[root] = image_files
-    else:
-        image_files = get_image_files(directory, recursive=False)
-        if image_files:
-            folders[directory] = image_files
-    return folders
+    return _cached_image_folders(directory, recursive)
 
 def get_image_timestamp(path):
     """
@@ -165,52 +212,270 @@ def get_image_timestamp(path):
     Args:
         path (str): Path to the image file.
     Returns:
-        datetime or None: Modification time, or None if unavailable.
+        float or None: Modification time in seconds since the epoch, or None if unavailable.
     """
     try:
-        return datetime.fromtimestamp(os.path.getmtime(path))
+        return os.path.getmtime(path)
     except Exception as e:
         logging.error(f"Failed to get timestamp for {path}: {e}")
         return None
 
-def is_similar_image(file1, file2):
+# int.bit_count is a single POPCNT on Python 3.10+; older interpreters count the binary string
+_popcount = getattr(int, "bit_count", None) or (lambda x: bin(x).count("1"))
+
+# Perceptual hashes keyed by (path, mtime_ns, size), so each file is decoded once per run;
+# persisted between runs in a sidecar database in the output folder
+_PHASH_CACHE = {}
+PHASH_DB_NAME = ".stereogrampo_cache.sqlite"
+
+def get_phash(path):
+    """
+    Return the phash of an image as a 64-bit int, computing it on first use.
+    Args:
+        path (str): Path to the image file.
+    Returns:
+        int: The perceptual hash.
+    """
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    if key not in _PHASH_CACHE:
+        with Image.open(path) as img:
+            # phash works on a 32x32 grayscale resize, so a JPEG only needs a reduced-scale decode
+            img.draft("L", (64, 64))
+            _PHASH_CACHE[key] = int(str(imagehash.phash(img)), 16)
+    return _PHASH_CACHE[key]
+
+def load_phash_cache(db_path):
+    """
+    Load phashes saved by an earlier run into the in-memory cache.
+    Args:
+        db_path (str): Path to the SQLite sidecar file.
+    """
+    if not os.path.exists(db_path):
+        return
+    try:
+        with closing(sqlite3.connect(db_path)) as conn:
+            for path, mtime, size, phash in conn.execute("SELECT path, mtime, size, phash FROM phash"):
+                _PHASH_CACHE[(path, mtime, size)] = int(phash, 16)
+    except sqlite3.Error as e:
+        logging.warning(f"Could not read hash cache {db_path}: {e}")
+
+def save_phash_cache(db_path, folder):
+    """
+    Store the cached phashes of files under a folder in the SQLite sidecar.
+    Failures (e.g. read-only media) are logged and otherwise ignored.
+    Args:
+        db_path (str): Path to the SQLite sidecar file.
+        folder (str): Source folder whose files should be saved.
+    """
+    prefix = os.path.join(folder, "")
+    rows = [
+        (path, mtime, size, f"{phash:016x}")
+        for (path, mtime, size), phash in _PHASH_CACHE.items()
+        if path.startswith(prefix)
+    ]
+    if not rows:
+        return
+    try:
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with closing(sqlite3.connect(db_path)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS phash (path TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, phash TEXT)"
+            )
+            conn.executemany("INSERT OR REPLACE INTO phash VALUES (?, ?, ?, ?)", rows)
+    except (sqlite3.Error, OSError) as e:
+        logging.warning(f"Could not write hash cache {db_path}: {e}")
+
+# Thumbnail dhash and aspect ratio per file, keyed like _PHASH_CACHE; cheap enough to recompute each run
+_THUMB_CACHE = {}
+
+def get_thumb_info(path):
+    """
+    Return a dhash of a reduced-size decode of an image and its aspect ratio, for rejecting
+    pairs before phash.
+    Args:
+        path (str): Path to the image file.
+    Returns:
+        tuple: (thumbnail hash as int, width / height).
+    """
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    if key not in _THUMB_CACHE:
+        with Image.open(path) as img:
+            # The size comes from the header; read it before draft() shrinks it
+            w, h = img.size
+            # JPEGs are decoded at a fraction of full size; other formats ignore the draft
+            img.draft("L", (64, 64))
+            _THUMB_CACHE[key] = (int(str(imagehash.dhash(img)), 16), w / h)
+    return _THUMB_CACHE[key]
+
+def thumbs_close(file1, file2, hash_threshold):
+    """
+    Cheap first check for is_similar_image.
+    Args:
+        file1 (str): Path to the first image.
+        file2 (str): Path to the second image.
+        hash_threshold (int): The phash threshold of the run.
+    Returns:
+        bool: False only if the images clearly differ in shape or thumbnail hash; unreadable
+        files pass so the phash check reports them.
+    """
+    try:
+        hash1, aspect1 = get_thumb_info(file1)
+        hash2, aspect2 = get_thumb_info(file2)
+    except Exception:
+        return True
+    if abs(aspect1 - aspect2) > ASPECT_TOLERANCE * aspect1:
+        return False
+    # Follows the (user-adjustable) phash threshold so the prefilter never cuts tighter than it
+    return _popcount(hash1 ^ hash2) <= THUMB_HASH_FACTOR * hash_threshold
+
+def _try_phash(path):
+    """Warm the phash cache for one file; failures are reported later by is_similar_image."""
+    try:
+        get_phash(path)
+    except Exception:
+        pass
+
+def _try_thumb_info(path):
+    """Warm the thumbnail cache for one file."""
+    try:
+        get_thumb_info(path)
+    except Exception:
+        pass
+
+def is_similar_image(file1, file2, hash_threshold):
     """
     Determine if two images are perceptually similar using phash.
+    Pairs that differ in shape or whose thumbnail hashes are far apart are rejected without
+    computing the phash.
     Args:
         file1 (str): Path to the first image.
         file2 (str): Path to the second image.
+        hash_threshold (int): Hash differences below this count as similar.
     Returns:
         bool: True if images are similar within the hash threshold.
     """
+    if not thumbs_close(file1, file2, hash_threshold):
+        return False
     try:
-        with Image.open(file1) as img1, Image.open(file2) as img2:
-            hash1 = imagehash.phash(img1)
-            hash2 = imagehash.phash(img2)
-        logging.info(f"Hash difference for {file1} and {file2}: {abs(hash1 - hash2)}")
-        return abs(hash1 - hash2) < HASH_DIFF_THRESHOLD
+        diff = _popcount(get_phash(file1) ^ get_phash(file2))
+        logging.info(f"Hash difference for {file1} and {file2}: {diff}")
+        return diff < hash_threshold
     except Exception as e:
         logging.error(f"Failed to compare images {file1} and {file2}: {e}")
         return False
 
-def align_images(left_path, right_path):
+# ORB detector and matcher, built once per worker process on first use
+_ALIGN_TOOLS = None
+
+def get_align_tools():
+    """
+    Return the shared feature detector and matcher used by align_images.
+    Returns:
+        tuple: (cv2.ORB, cv2.BFMatcher).
+    """
+    global _ALIGN_TOOLS
+    if _ALIGN_TOOLS is None:
+        _ALIGN_TOOLS = (cv2.ORB_create(nfeatures=500, fastThreshold=20), cv2.BFMatcher(cv2.NORM_HAMMING))
+    return _ALIGN_TOOLS
+
+_CUDA_ALIGN_TOOLS = None
+
+def get_cuda_align_tools():
+    """
+    Return the shared CUDA feature detector and matcher, for when HAS_CUDA is set.
+    Returns:
+        tuple: (cv2.cuda_ORB, cv2.cuda.DescriptorMatcher).
+    """
+    global _CUDA_ALIGN_TOOLS
+    if _CUDA_ALIGN_TOOLS is None:
+        _CUDA_ALIGN_TOOLS = (
+            cv2.cuda_ORB.create(nfeatures=500, fastThreshold=20),
+            cv2.cuda.DescriptorMatcher_createBFMatcher(cv2.NORM_HAMMING),
+        )
+    return _CUDA_ALIGN_TOOLS
+
+def ratio_test(knn_matches):
+    """
+    Keep the matches whose best candidate is clearly better than the second best.
+    Args:
+        knn_matches (list): knnMatch results with k=2.
+    Returns:
+        list: The accepted cv2.DMatch objects.
+    """
+    return [m[0] for m in knn_matches if len(m) == 2 and m[0].distance < MATCH_RATIO * m[1].distance]
+
+def match_features(left_gray, right_gray):
+    """
+    Detect ORB features in both images and match them on the CPU.
+    Args:
+        left_gray (numpy.ndarray): Left image, grayscale.
+        right_gray (numpy.ndarray): Right image, grayscale.
+    Returns:
+        tuple or None: (left keypoints, right keypoints, ratio-tested matches), or None if
+        either image has no descriptors.
+    """
+    orb, bf = get_align_tools()
+    keypoints1, descriptors1 = orb.detectAndCompute(left_gray, None)
+    keypoints2, descriptors2 = orb.detectAndCompute(right_gray, None)
+    if descriptors1 is None or descriptors2 is None:
+        return None
+    return keypoints1, keypoints2, ratio_test(bf.knnMatch(descriptors1, descriptors2, k=2))
+
+def match_features_cuda(left_gray, right_gray):
+    """
+    GPU version of match_features; raises cv2.error (or AttributeError on a build without
+    the CUDA feature modules) if a CUDA call fails.
+    Args:
+        left_gray (numpy.ndarray): Left image, grayscale.
+        right_gray (numpy.ndarray): Right image, grayscale.
+    Returns:
+        tuple or None: As match_features.
+    """
+    orb, matcher = get_cuda_align_tools()
+    left_gpu = cv2.cuda_GpuMat()
+    left_gpu.upload(left_gray)
+    right_gpu = cv2.cuda_GpuMat()
+    right_gpu.upload(right_gray)
+    keypoints1_gpu, descriptors1 = orb.detectAndComputeAsync(left_gpu, None)
+    keypoints2_gpu, descriptors2 = orb.detectAndComputeAsync(right_gpu, None)
+    if descriptors1.empty() or descriptors2.empty():
+        return None
+    matches = ratio_test(matcher.knnMatch(descriptors1, descriptors2, 2))
+    return orb.convert(keypoints1_gpu), orb.convert(keypoints2_gpu), matches
+
+def align_images(left_pil, right_pil, left_path, right_path):
     """
     Align two images by detecting rotation needed to make them horizontally level.
     Args:
-        left_path (str): Path to the left image.
-        right_path (str): Path to the right image.
+        left_pil (PIL.Image): Decoded left image, RGB.
+        right_pil (PIL.Image): Decoded right image, RGB.
+        left_path (str): Path to the left image, for log messages.
+        right_path (str): Path to the right image, for log messages.
     Returns:
         tuple: Aligned (left_image, right_image) as PIL Images, or None if alignment fails.
     """
     try:
-        left_img = cv2.imread(left_path, cv2.IMREAD_GRAYSCALE)
-        right_img = cv2.imread(right_path, cv2.IMREAD_GRAYSCALE)
-        if left_img is None or right_img is None:
-            logging.error(f"Failed to load images for alignment: {left_path}, {right_path}")
-            return None
+        right_np = np.asarray(right_pil)
+        left_img = cv2.cvtColor(np.asarray(left_pil), cv2.COLOR_RGB2GRAY)
+        right_img = cv2.cvtColor(right_np, cv2.COLOR_RGB2GRAY)
+        h, w = left_img.shape
 
-        orb = cv2.ORB_create()
-        keypoints1, descriptors1 = orb.detectAndCompute(left_img, None)
-        keypoints2, descriptors2 = orb.detectAndCompute(right_img, None)
+        # ORB finds plenty of features at reduced size; the homography is scaled back up below
+        scale = max(1, max(h, w) // ALIGN_MAX_DIM)
+        if scale > 1:
+            left_img = cv2.resize(left_img, None, fx=1 / scale, fy=1 / scale, interpolation=cv2.INTER_AREA)
+            right_img = cv2.resize(right_img, None, fx=1 / scale, fy=1 / scale, interpolation=cv2.INTER_AREA)
+
+        if HAS_CUDA:
+            try:
+                found = match_features_cuda(left_img, right_img)
+            except (AttributeError, cv2.error) as e:
+                logging.warning(f"CUDA feature matching failed, using the CPU: {e}")
+                found = match_features(left_img, right_img)
+        else:
+            found = match_features(left_img, right_img)
 
         """
         Bedsides the dependencies, you need to ensure the following are installed:
@@ -225,32 +490,43 @@ def align_images(left_path, right_path):
         ```
         """
 
-        if descriptors1 is None or descriptors2 is None:
+        if found is None:
             logging.error(f"No descriptors found for {left_path} or {right_path}")
             return None
 
-        bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
-        matches = bf.match(descriptors1, descriptors2)
-        matches = sorted(matches, key=lambda x: x.distance)
+        keypoints1, keypoints2, matches = found
 
         if len(matches) < 10:
             logging.warning(f"Too few matches ({len(matches)}) for {left_path} and {right_path}")
             return None
 
-        points1 = np.float32([keypoints1[m.queryIdx].pt for m in matches]).reshape(-1, 1, 2)
-        points2 = np.float32([keypoints2[m.trainIdx].pt for m in matches]).reshape(-1, 1, 2)
+        # (N, 2) float32 point arrays, gathered from all keypoint coordinates by match index
+        n = len(matches)
+        points1 = cv2.KeyPoint_convert(keypoints1)[np.fromiter((m.queryIdx for m in matches), np.intp, n)]
+        points2 = cv2.KeyPoint_convert(keypoints2)[np.fromiter((m.trainIdx for m in matches), np.intp, n)]
 
         H, _ = cv2.findHomography(points2, points1, cv2.RANSAC, 5.0)
         if H is None:
             logging.error(f"Homography estimation failed for {left_path} and {right_path}")
             return None
+        if scale > 1:
+            S = np.diag([scale, scale, 1.0])
+            H = S @ H @ np.linalg.inv(S)
 
-        left_pil = Image.open(left_path).convert('RGB')
-        right_pil = Image.open(right_path).convert('RGB')
-        right_np = np.array(right_pil)
-
-        h, w = left_img.shape
-        aligned_right_np = cv2.warpPerspective(right_np, H, (w, h))
+        aligned_right_np = None
+        if HAS_CUDA:
+            try:
+                right_gpu = cv2.cuda_GpuMat()
+                right_gpu.upload(right_np)
+                aligned_right_np = cv2.cuda.warpPerspective(right_gpu, H, (w, h)).download()
+            except (AttributeError, cv2.error) as e:
+                logging.warning(f"CUDA warp failed, using the CPU: {e}")
+        if aligned_right_np is None:
+            # Pairs shot moments apart are almost never projective; skip the per-pixel divide when H is affine
+            if abs(H[2, 0]) < 1e-6 and abs(H[2, 1]) < 1e-6 and abs(H[2, 2] - 1.0) < 1e-3:
+                aligned_right_np = cv2.warpAffine(right_np, H[:2] / H[2, 2], (w, h))
+            else:
+                aligned_right_np = cv2.warpPerspective(right_np, H, (w, h))
 
         aligned_right = Image.fromarray(aligned_right_np)
         return left_pil, aligned_right
@@ -258,6 +534,52 @@ def align_images(left_path, right_path):
         logging.error(f"Alignment failed for {left_path} and {right_path}: {e}")
         return None
 
+def _rig_capture_info(exif_bytes):
+    """
+    Pull the fields is_rig_pair compares out of a raw EXIF block.
+    Args:
+        exif_bytes (bytes): EXIF data as found in PIL's info['exif'].
+    Returns:
+        tuple or None: ((make, model, focal length, capture second), sub-second fraction, body
+        serial), or None if any of them is missing.
+    """
+    data = piexif.load(exif_bytes)
+    zeroth, exif = data.get("0th", {}), data.get("Exif", {})
+    camera = (
+        zeroth.get(piexif.ImageIFD.Make),
+        zeroth.get(piexif.ImageIFD.Model),
+        exif.get(piexif.ExifIFD.FocalLength),
+        exif.get(piexif.ExifIFD.DateTimeOriginal),
+    )
+    subsec = exif.get(piexif.ExifIFD.SubSecTimeOriginal)
+    serial = exif.get(piexif.ExifIFD.BodySerialNumber)
+    if None in camera or not subsec or not serial:
+        return None
+    return camera, float(b"0." + subsec.strip(b"\x00 ")), serial
+
+def is_rig_pair(left_exif, right_exif):
+    """
+    Tell whether a pair was shot together by two matched cameras on a rig, and so is already aligned.
+    A single camera taking two shots (the usual way pairs are made) never qualifies: the
+    bodies' serial numbers must differ.
+    Args:
+        left_exif (bytes or None): Raw EXIF block of the left image.
+        right_exif (bytes or None): Raw EXIF block of the right image.
+    Returns:
+        bool: True if make, model, focal length and capture second match, the shots are within
+        RIG_SYNC_TOLERANCE of each other, and the body serial numbers differ.
+    """
+    if not left_exif or not right_exif:
+        return False
+    try:
+        left = _rig_capture_info(left_exif)
+        right = _rig_capture_info(right_exif)
+    except Exception:
+        return False
+    if left is None or right is None:
+        return False
+    return left[0] == right[0] and abs(left[1] - right[1]) <= RIG_SYNC_TOLERANCE and left[2] != right[2]
+
 def create_anaglyph(left_img, right_img):
     """
     Create a red+cyan anaglyph stereogram from two images.
@@ -268,17 +590,30 @@ def create_anaglyph(left_img, right_img):
         PIL.Image: Anaglyph image.
     """
     try:
-        left_np = np.array(left_img)
-        right_np = np.array(right_img)
-        anaglyph = np.zeros_like(left_np)
-        anaglyph[:, :, 0] = left_np[:, :, 0]  # Red channel from left
-        anaglyph[:, :, 1] = right_np[:, :, 1]  # Green channel from right
-        anaglyph[:, :, 2] = right_np[:, :, 2]  # Blue channel from right
-        return Image.fromarray(anaglyph)
+        # Red from the left image, green and blue from the right, interleaved by PIL in one
+        # pass without converting either image to an array
+        return Image.merge("RGB", (left_img.getchannel(0), right_img.getchannel(1), right_img.getchannel(2)))
     except Exception as e:
         logging.error(f"Failed to create anaglyph: {e}")
         return None
 
+# Canvas reused for side-by-side and LRL output in this process; each result is saved before
+# the next pair is composed, and the tiles cover the whole canvas, so it never needs clearing
+_CANVAS = None
+
+def get_canvas(size):
+    """
+    Return the reusable composition canvas, reallocating it only when the size changes.
+    Args:
+        size (tuple): (width, height) of the canvas.
+    Returns:
+        PIL.Image: An RGB image of that size.
+    """
+    global _CANVAS
+    if _CANVAS is None or _CANVAS.size != size:
+        _CANVAS = Image.new('RGB', size)
+    return _CANVAS
+
 def create_side_by_side(left_img, right_img):
     """
     Create a side-by-side stereogram.
@@ -290,7 +625,7 @@ def create_side_by_side(left_img, right_img):
     """
     try:
         w, h = left_img.size
-        sbs = Image.new('RGB', (w * 2, h))
+        sbs = get_canvas((w * 2, h))
         sbs.paste(left_img, (0, 0))
         sbs.paste(right_img, (w, 0))
         return sbs
@@ -309,7 +644,7 @@ def create_left_right_left(left_img, right_img):
     """
     try:
         w, h = left_img.size
-        lrl = Image.new('RGB', (w * 3, h))
+        lrl = get_canvas((w * 3, h))
         lrl.paste(left_img, (0, 0))
         lrl.paste(right_img, (w, 0))
         lrl.paste(left_img, (w * 2, 0))
@@ -318,55 +653,197 @@ def create_left_right_left(left_img, right_img):
         logging.error(f"Failed to create left-right-left: {e}")
         return None
 
-def create_mpo(left_img, right_img, output_path):
+# MPF EXIF data written into every MPO; it does not depend on the images, so it is built once
+MPO_EXIF_BYTES = piexif.dump({'Exif': {
+    piexif.ExifIFD.MakerNote: (
+        b'MPF\0'  # MPFVersion
+        b'\x00\x00\x00\x02'  # NumberOfImages
+        b'\xb0\x01\x00\x00'  # MPEntry 1: Attribute (stereo)
+        b'\x00\x00\x00\x00'  # Size
+        b'\x00\x00\x00\x00'  # Offset
+        b'\x00\x00\x00\x00'  # Data
+        b'\xb0\x01\x00\x00'  # MPEntry 2: Attribute
+        b'\x00\x00\x00\x00'  # Size
+        b'\x00\x00\x00\x00'  # Offset
+        b'\x00\x00\x00\x00'  # Data
+    )
+}})
+
+def create_mpo(left_img, right_img, output_path, left_data=None):
     """
     Create an MPO file from two images.
     Args:
         left_img (PIL.Image): Left image.
         right_img (PIL.Image): Right image.
         output_path (str): Path to save the MPO file.
+        left_data (bytes, optional): JPEG bitstream of the left image, used as-is instead of
+            re-encoding left_img.
+    Returns:
+        bool: True if the file was written.
     """
     try:
         # Save left image with MPF tags
-        left_buffer = BytesIO()
-        left_img.save(left_buffer, format='JPEG', quality=95)
-        left_data = left_buffer.getvalue()
-
-        # Save right image
-        right_buffer = BytesIO()
-        right_img.save(right_buffer, format='JPEG', quality=95)
-        right_data = right_buffer.getvalue()
-
-        # Create MPF EXIF data
-        mpf_ifd = {
-            piexif.ExifIFD.MakerNote: (
-                b'MPF\0'  # MPFVersion
-                b'\x00\x00\x00\x02'  # NumberOfImages
-                b'\xb0\x01\x00\x00'  # MPEntry 1: Attribute (stereo)
-                b'\x00\x00\x00\x00'  # Size
-                b'\x00\x00\x00\x00'  # Offset
-                b'\x00\x00\x00\x00'  # Data
-                b'\xb0\x01\x00\x00'  # MPEntry 2: Attribute
-                b'\x00\x00\x00\x00'  # Size
-                b'\x00\x00\x00\x00'  # Offset
-                b'\x00\x00\x00\x00'  # Data
-            )
-        }
-
-        exif_dict = {'Exif': mpf_ifd}
-        exif_bytes = piexif.dump(exif_dict)
-
-        # Write MPO file
+        if left_data is None:
+            left_buffer = BytesIO()
+            left_img.save(left_buffer, format='JPEG', **JPEG_SAVE_OPTIONS)
+            left_data = left_buffer.getvalue()
+
+        # Insert the EXIF data into the first frame in memory, encode the second frame right
+        # after it in the same buffer, then write the file once
+        mpo_buffer = BytesIO()
+        piexif.insert(MPO_EXIF_BYTES, left_data, mpo_buffer)
+        mpo_buffer.seek(0, 2)
+        right_img.save(mpo_buffer, format='JPEG', **JPEG_SAVE_OPTIONS)
         with open(output_path, 'wb') as f:
-            f.write(left_data)
-            f.write(right_data)
-
-        # Insert EXIF data
-        piexif.insert(exif_bytes, output_path)
+            f.write(mpo_buffer.getbuffer())
 
         logging.info(f"Created MPO file: {output_path}")
+        return True
     except Exception as e:
         logging.error(f"Failed to create MPO file {output_path}: {e}")
+        return False
+
+# Output directories this process has already created, so each is made once per run
+_CREATED_DIRS = set()
+
+def ensure_dir(path):
+    """
+    Create a directory (and parents) the first time it is requested in this process.
+    Args:
+        path (str): Directory path.
+    Returns:
+        str: The same path, for use inline.
+    """
+    if path not in _CREATED_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _CREATED_DIRS.add(path)
+    return path
+
+# Output directories per (source folder, output root, format, mpo), so consecutive pairs from
+# one folder skip the relpath/join work as well as the makedirs
+_OUTPUT_DIRS = {}
+
+# Single I/O thread per (worker) process for MPO writes, created on first use
+_MPO_WRITER = None
+
+def get_mpo_writer():
+    """
+    Return the per-process thread pool that runs write_mpo off the compute path.
+    Returns:
+        ThreadPoolExecutor: Executor with one worker thread.
+    """
+    global _MPO_WRITER
+    if _MPO_WRITER is None:
+        _MPO_WRITER = ThreadPoolExecutor(max_workers=1)
+    return _MPO_WRITER
+
+def write_mpo(left_path, left_img, right_img, mpo_path):
+    """
+    Create the MPO for an aligned pair, reusing the left original's JPEG data when possible.
+    Args:
+        left_path (str): Path to the left source image.
+        left_img (PIL.Image): Aligned left image.
+        right_img (PIL.Image): Aligned right image.
+        mpo_path (str): Path to save the MPO file.
+    Returns:
+        bool: True if the file was written.
+    """
+    # Alignment only warps the right image, so a JPEG left original can go into the MPO
+    # without a decode/re-encode round trip
+    left_data = None
+    if left_path.lower().endswith((".jpg", ".jpeg")):
+        try:
+            with open(left_path, "rb") as f:
+                left_data = f.read()
+        except OSError:
+            pass
+        if left_data is not None and not left_data.startswith(b"\xff\xd8"):
+            left_data = None
+    return create_mpo(left_img, right_img, mpo_path, left_data)
+
+def get_output_dirs(source_dir, options):
+    """
+    Return (creating them on first use) the output directories mirroring a source folder.
+    Args:
+        source_dir (str): Folder holding the source images.
+        options (dict): The process_pair options.
+    Returns:
+        tuple: (stereogram output dir, MPO output dir or None).
+    """
+    key = (source_dir, options["output_root"], options["output_format"], options["mpo"])
+    dirs = _OUTPUT_DIRS.get(key)
+    if dirs is None:
+        out_base = os.path.join(options["output_root"], os.path.relpath(source_dir, options["folder"]))
+        output_dir = ensure_dir(os.path.join(out_base, options["output_format"]))
+        mpo_dir = ensure_dir(os.path.join(out_base, "mpo")) if options["mpo"] else None
+        dirs = _OUTPUT_DIRS[key] = (output_dir, mpo_dir)
+    return dirs
+
+def process_pair(index, left_path, right_path, options):
+    """
+    Create the stereogram (and optional MPO) for one stereo pair.
+    Runs in a worker process, so it takes only paths and plain option values.
+    Args:
+        index (int): Position of the pair, used for the output file names.
+        left_path (str): Path to the left image.
+        right_path (str): Path to the right image.
+        options (dict): 'folder' (source root), 'output_root', 'output_format' and 'mpo'.
+    Returns:
+        list or None: Paths of the files written, or None if the pair was skipped.
+    """
+    outputs = []
+    # Decode both images once; this doubles as validation and feeds alignment
+    try:
+        with Image.open(left_path) as left_file, Image.open(right_path) as right_file:
+            left_pil = left_file.convert('RGB')
+            right_pil = right_file.convert('RGB')
+            rig_pair = left_pil.size == right_pil.size and is_rig_pair(
+                left_file.info.get("exif"), right_file.info.get("exif")
+            )
+    except Exception as e:
+        logging.error(f"Invalid image pair {left_path}, {right_path}: {e}")
+        return None
+
+    output_dir, mpo_dir = get_output_dirs(os.path.dirname(left_path), options)
+
+    if rig_pair:
+        # Shot simultaneously by a matched rig, so the frames are already rectified
+        logging.info(f"Skipping alignment for rig pair {left_path}, {right_path}")
+        left_img, right_img = left_pil, right_pil
+    else:
+        aligned = align_images(left_pil, right_pil, left_path, right_path)
+        if aligned is None:
+            logging.error(f"Skipping pair {left_path}, {right_path} due to alignment failure")
+            return None
+        left_img, right_img = aligned
+
+    # Both outputs share one stem; the directories are already joined, so plain concatenation is enough
+    stem = f"stereo_{index:04d}"
+    output_path = output_dir + os.sep + stem + ".jpg"
+
+    # The MPO is encoded and written on this process's writer thread while the stereogram is
+    # composed and encoded here
+    mpo_future = None
+    if options["mpo"]:
+        mpo_path = mpo_dir + os.sep + stem + ".mpo"
+        mpo_future = get_mpo_writer().submit(write_mpo, left_path, left_img, right_img, mpo_path)
+
+    if options["output_format"] == "anaglyph":
+        result = create_anaglyph(left_img, right_img)
+    elif options["output_format"] == "sbs":
+        result = create_side_by_side(left_img, right_img)
+    else:  # lrl
+        result = create_left_right_left(left_img, right_img)
+
+    if result:
+        result.save(output_path, "JPEG", **JPEG_SAVE_OPTIONS)
+        outputs.append(output_path)
+        logging.info(f"Created stereogram: {output_path}")
+
+    if mpo_future is not None and mpo_future.result():
+        outputs.append(mpo_path)
+
+    return outputs
 
 def confirm_close(root, progress):
     """
@@ -406,6 +883,16 @@ def main():
     root.option_add("*Font", default_font)
     root.geometry("600x800")
 
+    # All ttk styles are set up once, before any widget uses them
+    style = ttk.Style()
+    style.configure("TCheckbutton", background="lightcoral", foreground="blue")
+    style.configure("TRadiobutton", background="lightcoral", foreground="blue")
+    for frame_style in (
+        "TFrame", "FolderOptions.TFrame", "OutputFormat.TFrame", "FolderStructure.TFrame",
+        "Thresholds.TFrame", "Progress.TFrame", "Labels.TFrame", "Buttons.TFrame",
+    ):
+        style.configure(frame_style, background="lightcoral")
+
     # Center window
     screen_width = root.winfo_screenwidth()
     screen_height = root.winfo_screenheight()
@@ -449,6 +936,7 @@ def main():
         if folder:
             selected_folder["path"] = folder
             save_last_folder(folder)
+            clear_scan_cache()
             label_selected_folder.config(text=folder, fg="blue")
             listbox_results.delete(0, END)
             progress["value"] = 0
@@ -466,11 +954,7 @@ def main():
     # Folder options
     frame_folder_options = ttk.Frame(root)
     frame_folder_options.pack(pady=5, fill="x")
-    style = ttk.Style()
-    style.configure("TCheckbutton", background="lightcoral", foreground="blue")
-    style.configure("TFrame", background="lightcoral")
     frame_folder_options.configure(style="FolderOptions.TFrame")
-    style.configure("FolderOptions.TFrame", background="lightcoral")
 
     frame_folder_options.columnconfigure(0, weight=1)
     frame_folder_options.columnconfigure(1, weight=0)
@@ -503,8 +987,6 @@ def main():
     frame_output_format = ttk.Frame(root)
     frame_output_format.pack(pady=5, fill="x")
     frame_output_format.configure(style="OutputFormat.TFrame")
-    style.configure("OutputFormat.TFrame", background="lightcoral")
-    style.configure("TRadiobutton", background="lightcoral", foreground="blue")
 
     output_format_var = StringVar(value="anaglyph")
     Label(frame_output_format, text="Output Format:", bg="lightcoral", fg="blue").pack(anchor="w", padx=10)
@@ -542,7 +1024,6 @@ def main():
     frame_folder_structure = ttk.Frame(root)
     frame_folder_structure.pack(pady=5, fill="x")
     frame_folder_structure.configure(style="FolderStructure.TFrame")
-    style.configure("FolderStructure.TFrame", background="lightcoral")
 
     folder_structure_var = StringVar(value="single")
     Label(frame_folder_structure, text="Folder Structure:", bg="lightcoral", fg="blue").pack(anchor="w", padx=10)
@@ -572,7 +1053,6 @@ def main():
     frame_thresholds = ttk.Frame(root)
     frame_thresholds.pack(pady=5, fill="x")
     frame_thresholds.configure(style="Thresholds.TFrame")
-    style.configure("Thresholds.TFrame", background="lightcoral")
 
     frame_thresholds.columnconfigure(0, weight=1)
     frame_thresholds.columnconfigure(1, weight=0)
@@ -619,8 +1099,10 @@ def main():
     # Listbox for folder contents
     frame_listbox = ttk.Frame(root)
     frame_listbox.pack(fill="both", expand=True, padx=10, pady=5)
+    # Rows live in a Tcl list variable: a refresh replaces them all with one assignment
+    folder_contents_var = Variable(value=())
     listbox_folder_contents = Listbox(
-        frame_listbox, width=80, height=10, bg="lightblue", fg="blue"
+        frame_listbox, width=80, height=10, bg="lightblue", fg="blue", listvariable=folder_contents_var
     )
     listbox_folder_contents.pack(side="left", fill="both", expand=True)
     scrollbar_folder = ttk.Scrollbar(
@@ -637,49 +1119,72 @@ def main():
     label_image_count = Label(root, text="No folder selected")
     label_image_count.pack()
 
+    shown_rows = [()]
+
+    def show_folder_rows(rows):
+        """Replace the folder contents rows, skipping the Tk update if nothing changed."""
+        rows = tuple(rows)
+        if rows != shown_rows[0]:
+            folder_contents_var.set(rows)
+            shown_rows[0] = rows
+
+    folder_scan_generation = [0]
+
     def update_folder_contents_listbox():
-        """Update Listbox with folder contents based on folder structure."""
-        listbox_folder_contents.delete(0, END)
+        """Update Listbox with folder contents based on folder structure, scanning in the background."""
         folder = selected_folder["path"]
+        folder_scan_generation[0] += 1
+        generation = folder_scan_generation[0]
         if not folder:
+            show_folder_rows(())
             return
-        try:
-            structure = folder_structure_var.get()
-            if structure == "lr_folders":
-                folders_dict = {}
-                left_folder = os.path.join(folder, "Left")
-                right_folder = os.path.join(folder, "Right")
-                if os.path.isdir(left_folder) and os.path.isdir(right_folder):
-                    left_files = get_image_files(left_folder, recursive=False)
-                    right_files = get_image_files(right_folder, recursive=False)
-                    folders_dict[left_folder] = left_files
-                    folders_dict[right_folder] = right_files
-            else:
-                folders_dict = get_image_files_by_folder(
-                    folder, recursive=(structure == "subfolders")
-                )
-            total_images = sum(len(files) for files in folders_dict.values())
-            label_image_count.config(text=f"Total images found: {total_images}")
-            for subfolder, files in sorted(folders_dict.items()):
-                rel_subfolder = os.path.relpath(subfolder, folder)
-                listbox_folder_contents.insert(END, f"[{rel_subfolder}]")
-                for f in sorted(files):
-                    listbox_folder_contents.insert(END, f"    {os.path.basename(f)}")
-        except Exception as e:
-            label_image_count.config(text="Error reading folder")
-            listbox_folder_contents.insert(END, f"Error: {e}")
-            logging.error(f"Error updating folder contents: {e}")
+        structure = folder_structure_var.get()
+
+        def show_scan(count_text, lines):
+            # A newer scan was started while this one ran; its result wins
+            if generation != folder_scan_generation[0]:
+                return
+            label_image_count.config(text=count_text)
+            show_folder_rows(lines)
+
+        def scan():
+            try:
+                if structure == "lr_folders":
+                    folders_dict = {}
+                    left_folder = os.path.join(folder, "Left")
+                    right_folder = os.path.join(folder, "Right")
+                    if os.path.isdir(left_folder) and os.path.isdir(right_folder):
+                        left_files = get_image_files(left_folder, recursive=False)
+                        right_files = get_image_files(right_folder, recursive=False)
+                        folders_dict[left_folder] = left_files
+                        folders_dict[right_folder] = right_files
+                else:
+                    folders_dict = get_image_files_by_folder(
+                        folder, recursive=(structure == "subfolders")
+                    )
+                total_images = sum(len(files) for files in folders_dict.values())
+                # Build all rows first and hand them to Tk in one call
+                lines = []
+                for subfolder, files in sorted(folders_dict.items()):
+                    rel_subfolder = os.path.relpath(subfolder, folder)
+                    lines.append(f"[{rel_subfolder}]")
+                    lines.extend(f"    {os.path.basename(f)}" for f in sorted(files))
+                root.after(0, show_scan, f"Total images found: {total_images}", lines)
+            except Exception as e:
+                logging.error(f"Error updating folder contents: {e}")
+                root.after(0, show_scan, "Error reading folder", [f"Error: {e}"])
+
+        # Listing a large or network folder can take a while, so keep it off the Tk thread
+        threading.Thread(target=scan, daemon=True).start()
 
     # Progress bar and info
     frame_progress = ttk.Frame(root)
     frame_progress.pack(pady=5, fill="x")
     frame_progress.configure(style="Progress.TFrame")
-    style.configure("Progress.TFrame", background="lightcoral")
 
     frame_labels = ttk.Frame(frame_progress)
     frame_labels.pack(fill="x")
     frame_labels.configure(style="Labels.TFrame")
-    style.configure("Labels.TFrame", background="lightcoral")
 
     frame_left = ttk.Frame(frame_labels)
     frame_left.pack(side="left", anchor="w")
@@ -726,159 +1231,253 @@ def main():
         label_total.config(text="Total: --")
         listbox_results.delete(0, END)
 
+        # Read the Tk variables here, on the Tk thread, once per run; the worker only sees plain values
+        structure = folder_structure_var.get()
+        output_format = output_format_var.get()
+        mpo_output = mpo_output_var.get() == "1"
+        delete_originals = delete_originals_var.get() == "1"
+        # Thresholds are fixed for the run, even if the entries are edited while it is going
+        time_threshold = TIME_DIFF_THRESHOLD
+        hash_threshold = HASH_DIFF_THRESHOLD
+
+        # The worker only records the latest progress here and queues any other UI calls;
+        # pump() applies both on the Tk thread at most 10 times a second, so the worker
+        # never touches Tk itself
+        progress_state = {"args": None, "running": True}
+        progress_lock = threading.Lock()
+        ui_calls = queue.Queue()
+
+        def on_ui(fn, *args):
+            """Run fn(*args) on the Tk thread at the next pump tick."""
+            ui_calls.put((fn, args))
+
+        def ask_on_ui(fn, *args):
+            """Run fn(*args) on the Tk thread and wait for its result."""
+            answer = queue.Queue(maxsize=1)
+            on_ui(lambda: answer.put(fn(*args)))
+            return answer.get()
+
+        def pump():
+            with progress_lock:
+                args, progress_state["args"] = progress_state["args"], None
+                running = progress_state["running"]
+            if args is not None:
+                update_progress(*args)
+            while True:
+                try:
+                    fn, fn_args = ui_calls.get_nowait()
+                except queue.Empty:
+                    break
+                fn(*fn_args)
+            if running:
+                root.after(100, pump)
+
         def task():
-            start_time = time.time()
-            structure = folder_structure_var.get()
-            output_format = output_format_var.get()
-            mpo_output = mpo_output_var.get() == "1"
-            delete_originals = delete_originals_var.get() == "1"
+            start_time = time.monotonic()
             source_base = os.path.basename(folder)
             output_root = os.path.join(os.path.dirname(folder), f"_3d_{source_base}")
             log_file = os.path.join(folder, f"stereogram_maker_{output_format}_log.txt")
-            processed_files = []
-            deleted_files = []
 
             # Get pairs
             if structure == "lr_folders":
                 left_folder = os.path.join(folder, "Left")
                 right_folder = os.path.join(folder, "Right")
                 if not (os.path.isdir(left_folder) and os.path.isdir(right_folder)):
-                    root.after(0, lambda: messagebox.showerror("Error", "Left or Right folder missing."))
+                    on_ui(messagebox.showerror, "Error", "Left or Right folder missing.")
                     return
                 left_files = get_image_files(left_folder, recursive=False)
                 right_files = get_image_files(right_folder, recursive=False)
                 left_files.sort()
                 right_files.sort()
-                pairs = [(left_files[i], right_files[i]) for i in range(min(len(left_files), len(right_files)))]
-                total_files = len(pairs)
+                pair_source = [(left_files[i], right_files[i]) for i in range(min(len(left_files), len(right_files)))]
+                total_files = len(pair_source)
             else:
                 folders_dict = get_image_files_by_folder(folder, recursive=(structure == "subfolders"))
                 image_files = [f for files in folders_dict.values() for f in files]
                 total_files = len(image_files) if structure == "single" else sum(len(files) // 2 for files in folders_dict.values())
-                pairs = []
                 if structure == "single":
                     image_files.sort()
-                    pairs = [(image_files[i], image_files[i + 1]) for i in range(0, len(image_files) - 1, 2)]
+                    pair_source = [(image_files[i], image_files[i + 1]) for i in range(0, len(image_files) - 1, 2)]
                 else:
-                    for subfolder, files in folders_dict.items():
-                        files.sort(key=get_image_timestamp)
-                        used = set()
-                        for i, path1 in enumerate(files):
-                            if path1 in used:
-                                continue
-                            time1 = get_image_timestamp(path1)
-                            for j in range(i + 1, len(files)):
-                                path2 = files[j]
-                                if path2 in used:
-                                    continue
-                                time2 = get_image_timestamp(path2)
-                                if time2 and abs((time2 - time1).total_seconds()) <= TIME_DIFF_THRESHOLD:
-                                    if is_similar_image(path1, path2):
-                                        pairs.append((path1, path2))
-                                        used.add(path1)
-                                        used.add(path2)
-                                        break
+                    def iter_subfolder_pairs():
+                        """Yield each subfolder's pairs as they are found, so processing starts early."""
+                        # Hashes from earlier runs over this folder, for files that have not changed
+                        phash_db = os.path.join(output_root, PHASH_DB_NAME)
+                        load_phash_cache(phash_db)
+                        try:
+                            # One pool for every subfolder's timestamp and hash work
+                            with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as hash_pool:
+                                for subfolder, files in folders_dict.items():
+                                    # Read each timestamp once, in parallel (a stat per file adds up on network
+                                    # shares); files without one cannot be paired
+                                    stamped = list(zip(hash_pool.map(get_image_timestamp, files), files))
+                                    stamped = sorted((s for s in stamped if s[0] is not None), key=lambda s: s[0])
+                                    # Thumbnail-hash, in parallel, every file that has a neighbour inside the time
+                                    # window; the others are never compared
+                                    candidates = [
+                                        p for k, (t, p) in enumerate(stamped)
+                                        if (k > 0 and t - stamped[k - 1][0] <= time_threshold)
+                                        or (k + 1 < len(stamped) and stamped[k + 1][0] - t <= time_threshold)
+                                    ]
+                                    list(hash_pool.map(_try_thumb_info, candidates))
+                                    # Only files with a close-looking neighbour need the full phash
+                                    close = set()
+                                    for k, (t, p) in enumerate(stamped):
+                                        for m in range(k + 1, len(stamped)):
+                                            t2, p2 = stamped[m]
+                                            if t2 - t > time_threshold:
+                                                break
+                                            if thumbs_close(p, p2, hash_threshold):
+                                                close.add(p)
+                                                close.add(p2)
+                                    list(hash_pool.map(_try_phash, close))
+                                    used = set()
+                                    for i, (time1, path1) in enumerate(stamped):
+                                        if path1 in used:
+                                            continue
+                                        # Sorted by time, so the candidates end at the first file past the window
+                                        for j in range(i + 1, len(stamped)):
+                                            time2, path2 = stamped[j]
+                                            if time2 - time1 > time_threshold:
+                                                break
+                                            if path2 in used:
+                                                continue
+                                            if is_similar_image(path1, path2, hash_threshold):
+                                                yield path1, path2
+                                                used.add(path1)
+                                                used.add(path2)
+                                                break
+                        finally:
+                            save_phash_cache(phash_db, folder)
+
+                    pair_source = iter_subfolder_pairs()
+
+            with progress_lock:
+                progress_state["args"] = (0, 0, None, 0, total_files)
+
+            options = {
+                "folder": folder,
+                "output_root": output_root,
+                "output_format": output_format,
+                "mpo": mpo_output,
+            }
+            pairs = []
+            processed = [0]
+            produced = [0]
+            last_elapsed = [0.0]
+            ema_per_pair = [None]
 
-            root.after(0, update_progress, 0, 0, None, 0, total_files)
+            # The log is written as the run goes, so only counts are kept in memory and an
+            # interrupted run still leaves a partial log
+            try:
+                log = open(log_file, "w", encoding="utf-8", buffering=1 << 16)
+                log.write(f"Stereogram Maker Log - {datetime.now()}\n")
+                log.write(f"Output Format: {output_format}\n")
+                log.write(f"MPO Output: {'Yes' if mpo_output else 'No'}\n")
+                log.write(f"Folder Structure: {structure}\n")
+                log.write(f"Output Root: {output_root}\n")
+                log.write("Output Files:\n")
+            except Exception as e:
+                logging.error(f"Failed to write log file {log_file}: {e}")
+                log = None
 
-            processed = [0]
-            for i, (left_path, right_path) in enumerate(pairs):
-                while not pause_event.is_set():
-                    time.sleep(0.1)
+            def log_file_entry(path):
+                if log is not None:
+                    log.write(f"  {path}\n")
 
-                # Validate images
+            def record(future):
                 try:
-                    with Image.open(left_path) as left_img, Image.open(right_path) as right_img:
-                        pass
+                    outputs = future.result()
                 except Exception as e:
-                    logging.error(f"Invalid image pair {left_path}, {right_path}: {e}")
-                    continue
-
-                # Create output directory
-                rel_path = os.path.relpath(os.path.dirname(left_path), folder)
-                output_dir = os.path.join(output_root, rel_path, f"{output_format}")
-                os.makedirs(output_dir, exist_ok=True)
-                if mpo_output:
-                    mpo_dir = os.path.join(output_root, rel_path, f"mpo")
-                    os.makedirs(mpo_dir, exist_ok=True)
-
-                aligned = align_images(left_path, right_path)
-                if aligned is None:
-                    logging.error(f"Skipping pair {left_path}, {right_path} due to alignment failure")
-                    continue
-                left_img, right_img = aligned
-
-                output_name = f"stereo_{i:04d}.jpg"
-                output_path = os.path.join(output_dir, output_name)
-                if output_format == "anaglyph":
-                    result = create_anaglyph(left_img, right_img)
-                elif output_format == "sbs":
-                    result = create_side_by_side(left_img, right_img)
-                else:  # lrl
-                    result = create_left_right_left(left_img, right_img)
-
-                if result:
-                    result.save(output_path, quality=95)
-                    processed_files.append(output_path)
-                    logging.info(f"Created stereogram: {output_path}")
-
-                if mpo_output:
-                    mpo_path = os.path.join(mpo_dir, f"stereo_{i:04d}.mpo")
-                    create_mpo(left_img, right_img, mpo_path)
-                    if os.path.exists(mpo_path):
-                        processed_files.append(mpo_path)
-
+                    logging.error(f"Pair processing failed: {e}")
+                    return
+                if outputs is None:
+                    return
+                for path in outputs:
+                    log_file_entry(path)
+                if log is not None:
+                    # One write per finished pair, so even a crash loses at most the pair in hand
+                    log.flush()
+                produced[0] += len(outputs)
                 processed[0] += 1
-                elapsed = max(0, time.time() - start_time - total_paused_time[0])
-                avg_time_per_file = elapsed / max(1, processed[0])
-                remaining = avg_time_per_file * (total_files - processed[0])
-                root.after(0, update_progress, (processed[0] / total_files) * 100, elapsed, remaining, processed[0], total_files)
-
-            if delete_originals and processed_files:
-                if messagebox.askyesno("Confirm Delete", "Delete original files? This cannot be undone."):
-                    for left_path, right_path in pairs:
-                        try:
-                            if os.path.exists(left_path):
-                                os.remove(left_path)
-                                deleted_files.append(left_path)
-                            if os.path.exists(right_path):
-                                os.remove(right_path)
-                                deleted_files.append(right_path)
-                        except Exception as e:
-                            logging.error(f"Failed to delete {left_path} or {right_path}: {e}")
-
-            # Write log file
-            try:
-                with open(log_file, "w", encoding="utf-8") as f:
-                    f.write(f"Stereogram Maker Log - {datetime.now()}\n")
-                    f.write(f"Output Format: {output_format}\n")
-                    f.write(f"MPO Output: {'Yes' if mpo_output else 'No'}\n")
-                    f.write(f"Folder Structure: {structure}\n")
-                    f.write(f"Output Root: {output_root}\n")
-                    f.write(f"Processed Pairs: {len(pairs)}\n")
-                    f.write("Output Files:\n")
-                    for file in processed_files:
-                        f.write(f"  {file}\n")
-                    if deleted_files:
-                        f.write("Deleted Originals:\n")
-                        for file in deleted_files:
-                            f.write(f"  {file}\n")
-            except Exception as e:
-                logging.error(f"Failed to write log file {log_file}: {e}")
+                elapsed = max(0, time.monotonic() - start_time - total_paused_time[0])
+                # Smoothed time per pair, so the estimate follows the current rate rather than the run average
+                dt = elapsed - last_elapsed[0]
+                last_elapsed[0] = elapsed
+                ema_per_pair[0] = dt if ema_per_pair[0] is None else 0.2 * dt + 0.8 * ema_per_pair[0]
+                remaining = ema_per_pair[0] * (total_files - processed[0])
+                with progress_lock:
+                    progress_state["args"] = ((processed[0] / total_files) * 100, elapsed, remaining, processed[0], total_files)
 
-            root.after(0, lambda: [
-                listbox_results.insert(END, f"Processed {len(pairs)} pairs"),
-                listbox_results.insert(END, f"Output files: {len(processed_files)}"),
-                messagebox.showinfo("Done", f"Created {len(processed_files)} stereograms/MPOs.")
-            ])
+            try:
+                # Pairs are independent, so they run in worker processes. Submissions are kept a
+                # little ahead of the workers so Pause still takes effect between pairs.
+                workers = os.cpu_count() or 1
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    in_flight = set()
+                    # Subfolder pairs arrive while later folders are still being paired
+                    for i, (left_path, right_path) in enumerate(pair_source):
+                        pairs.append((left_path, right_path))
+                        # Blocks while paused and wakes as soon as Continue sets the event
+                        pause_event.wait()
+                        in_flight.add(executor.submit(process_pair, i, left_path, right_path, options))
+                        if len(in_flight) >= workers * 2:
+                            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                record(future)
+                    for future in as_completed(in_flight):
+                        record(future)
+                if log is not None:
+                    log.write(f"Processed Pairs: {len(pairs)}\n")
+
+                if delete_originals and produced[0]:
+                    if ask_on_ui(messagebox.askyesno, "Confirm Delete", "Delete original files? This cannot be undone."):
+                        deleted_header = [False]
+
+                        def log_deleted(path):
+                            if log is not None and not deleted_header[0]:
+                                log.write("Deleted Originals:\n")
+                                deleted_header[0] = True
+                            log_file_entry(path)
+
+                        for left_path, right_path in pairs:
+                            for path in (left_path, right_path):
+                                try:
+                                    os.remove(path)
+                                except FileNotFoundError:
+                                    continue
+                                except OSError as e:
+                                    logging.error(f"Failed to delete {path}: {e}")
+                                    continue
+                                log_deleted(path)
+                        clear_scan_cache()
+            finally:
+                if log is not None:
+                    try:
+                        log.close()
+                    except Exception as e:
+                        logging.error(f"Failed to write log file {log_file}: {e}")
+
+            def show_done():
+                listbox_results.insert(END, f"Processed {len(pairs)} pairs", f"Output files: {produced[0]}")
+                messagebox.showinfo("Done", f"Created {produced[0]} stereograms/MPOs.")
+
+            on_ui(show_done)
+
+        def run_task():
+            try:
+                task()
+            finally:
+                with progress_lock:
+                    progress_state["running"] = False
 
-        threading.Thread(target=task, daemon=True).start()
+        threading.Thread(target=run_task, daemon=True).start()
+        root.after(100, pump)
 
     # Buttons
     frame_buttons = ttk.Frame(root)
     frame_buttons.pack(fill="x", pady=10)
     frame_buttons.configure(style="Buttons.TFrame")
-    style.configure("Buttons.TFrame", background="lightcoral")
 
     frame_buttons.columnconfigure(0, weight=1)
     frame_buttons.columnconfigure(1, weight=0)
@@ -909,12 +1508,12 @@ def main():
         if pause_event.is_set():
             pause_event.clear()
             pause_continue_label.set("Continue")
-            pause_start_time[0] = time.time()
+            pause_start_time[0] = time.monotonic()
         else:
             pause_event.set()
             pause_continue_label.set("Pause")
             if pause_start_time[0] is not None:
-                total_paused_time[0] += time.time() - pause_start_time[0]
+                total_paused_time[0] += time.monotonic() - pause_start_time[0]
                 pause_start_time[0] = None
 
     button_pause = Button(
@@ -953,5 +1552,7 @@ if __name__ == "__main__":
         print(f"Error: Missing required module: {e}")
         print("Please install the required modules using:")
         print("pip install opencv-python Pillow imagehash piexif numpy")
+        print("(pillow-simd can be installed in place of Pillow for faster JPEG encoding)")
         sys.exit(1)
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file